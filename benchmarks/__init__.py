@@ -0,0 +1,46 @@
+#benchmarks for the engine, each module can be run from the repository root with "python -m benchmarks.<module>"
+#the helpers shared between them are kept here.
+#the ones that load levels need pygame and the game's images, so they have to be run from the repository root.
+#SDL's dummy video driver is used so no window is opened.
+import os, time, random
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from level_generator import generateLevel
+
+#runs func repeat times and returns the best time it took in seconds
+def bestTime(func, repeat = 5):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        taken = time.perf_counter() - start
+        if best == None or taken < best:
+            best = taken
+    return best
+
+#gets count random query areas [x, y, width, height] inside a width by height map, using a fixed seed
+#sizes is the list of [width, height] sizes to pick from
+def randomAreas(count, width, height, sizes, seed = 0):
+    rand = random.Random(seed)
+    areas = []
+    for i in range(count):
+        size = rand.choice(sizes)
+        areas.append([rand.uniform(0, width - size[0]), rand.uniform(0, height - size[1]), size[0], size[1]])
+    return areas
+
+#makes a synthetic level in the .tmd format ([width, height, grid], see Level.load_JSON) using a fixed seed, with the same
+#generator as the stress levels (see level_generator.generateLevel). Of the tiles inside the edge density are walls,
+#2% toggle walls, 1% turrets and 1% spikes, with the spawn in the bottom left. Each cell only has the one layer.
+def syntheticMap(width, height, density = 0.3, seed = 0):
+    inside = (width - 2) * (height - 2)
+    return generateLevel(width, height, density, toggle_walls = int(inside * 0.02), turrets = int(inside * 0.01), spikes = int(inside * 0.01), seed = seed)
+
+#prints a table of results, rows is a list of lists with the same length as headers
+def printTable(headers, rows):
+    widths = [len(header) for header in headers]
+    for row in rows:
+        for i in range(len(row)):
+            widths[i] = max(widths[i], len(str(row[i])))
+    print("  ".join(headers[i].ljust(widths[i]) for i in range(len(headers))))
+    for row in rows:
+        print("  ".join(str(row[i]).ljust(widths[i]) for i in range(len(row))))
@@ -0,0 +1,35 @@
+#runs the benchmark suite (see benchmarks/suite.py) from the repository root:
+#   python -m benchmarks                                   runs everything and prints the times
+#   python -m benchmarks -o base.json                      also saves the results
+#   python -m benchmarks --compare base.json               compares this run with saved results
+#   python -m benchmarks --compare base.json new.json      compares two saved runs without running anything
+#   python -m benchmarks --only collision,level            only runs some of the groups
+import sys, argparse
+from benchmarks import suite
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(prog = "python -m benchmarks", description = "runs the benchmark suite and saves or compares the results as JSON")
+    parser.add_argument("-o", "--output", help = "file to save the results to")
+    parser.add_argument("--compare", nargs = "+", metavar = "RESULTS", help = "saved results to compare with, two files are compared with each other")
+    parser.add_argument("--only", help = "comma separated groups to run (" + ", ".join(bench[0] for bench in suite.BENCHMARKS) + ")")
+    parser.add_argument("--threshold", type = float, default = 10, help = "percent slower that counts as a regression")
+    args = parser.parse_args(argv)
+
+    old = None
+    if args.compare != None:
+        old = suite.loadResults(args.compare[0])
+        if len(args.compare) > 1:
+            slower = suite.printResults(suite.loadResults(args.compare[1]), old, args.threshold / 100.0)
+            return len(slower)
+
+    names = None
+    if args.only != None:
+        names = args.only.split(",")
+    new = suite.runSuite(names)
+    if args.output != None:
+        suite.saveResults(new, args.output)
+    slower = suite.printResults(new, old, args.threshold / 100.0)
+    return len(slower)
+
+if __name__ == "__main__":
+    sys.exit(min(1, main()))
@@ -0,0 +1,56 @@
+#counts the blits in a frame with the camera in the middle of the level, drawing each decoration and block in the draw cells on screen
+#against Level.draw blitting the baked pictures of the cells (see Level.bakeChunk) and then the blocks that move.
+#also times a frame where every cell on screen has to be baked again (like after a toggle wall flips).
+import json
+from benchmarks import bestTime, syntheticMap, printTable
+
+def run():
+    import game_main
+    from pylevel import Level, drawOrder
+    game = game_main.game
+    screen = game.screen
+    maps = [["maptest", json.load(open("res/levels/maptest.tmd"))]]
+    for size in [50, 100, 200]:
+        maps.append([str(size) + "x" + str(size), syntheticMap(size, size)])
+    rows = []
+    for name, data in maps:
+        level = game.loadLevel(None, None, data, Level.JSON_LOAD, False)
+        level.player.x = level.map_width / 2
+        level.player.y = level.map_height / 2
+        level.updateCamera()
+        offset = level.offset
+        width = screen.get_width()
+        height = screen.get_height()
+        margin = level.draw_margin
+        one_by_one = [0]
+        def eachBlock():
+            blocks = []
+            drawn = 0
+            for chunk in level.visibleChunks(offset.x, offset.y, width, height):
+                for decoration in chunk[0]:
+                    decoration.draw(screen, offset)
+                drawn += len(chunk[0])
+                blocks.extend(chunk[1])
+            for block in level.moving:
+                if block.x < offset.x + width and block.x + block.width + margin > offset.x and block.y < offset.y + height and block.y + block.height + margin > offset.y:
+                    blocks.append(block)
+            blocks.sort(key = drawOrder)
+            for block in blocks:
+                block.draw(screen, offset)
+            one_by_one[0] = drawn + len(blocks)
+        baked = [0]
+        def bakedFrame():
+            baked[0] = level.draw(screen)
+        def rebakedFrame():
+            level.baked = {}
+            level.draw(screen)
+        each_time = bestTime(eachBlock)
+        level.draw(screen)
+        baked_time = bestTime(bakedFrame)
+        rebake_time = bestTime(rebakedFrame)
+        saved = 100 - (100.0 * baked[0] / one_by_one[0])
+        rows.append([name, one_by_one[0], baked[0], str(round(saved, 1)) + "%", round(each_time * 1000, 2), round(baked_time * 1000, 2), round(rebake_time * 1000, 2)])
+    printTable(["map", "blits each", "blits baked", "fewer", "each ms", "baked ms", "rebake ms"], rows)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,60 @@
+#compares area queries against static blocks kept in the chunk grid and in a StaticBVH (see pycol.World.buildStatic)
+#on a sparse map (a few clusters of walls in a big empty level) and a dense one (walls over half the tiles)
+import random
+from pycol import World, Block
+from benchmarks import bestTime, randomAreas, printTable
+
+TILE = 32
+
+#static wall block for the benchmark
+class Wall(Block):
+    def get_type(self):
+        return "wall"
+
+#fills world with walls on a tiles by tiles map, density is the chance of a tile being a wall
+#clusters is the number of areas the walls are kept in (0 spreads them over the whole map)
+def buildMap(world, tiles, density, clusters, seed = 0):
+    rand = random.Random(seed)
+    cells = []
+    if clusters == 0:
+        cells = [[x, y] for x in range(tiles) for y in range(tiles)]
+    else:
+        for i in range(clusters):
+            cx, cy = rand.randrange(tiles - 20), rand.randrange(tiles - 20)
+            cells.extend([cx + x, cy + y] for x in range(20) for y in range(20))
+    count = 0
+    for cell in cells:
+        if rand.random() < density:
+            Wall(world, cell[0] * TILE, cell[1] * TILE, TILE, TILE, world.nextID()).updateChunks()
+            count += 1
+    return count
+
+#runs the queries against a world, returns [best time per query in microseconds, blocks found]
+def runQueries(world, areas):
+    found = [0]
+    def query():
+        found[0] = 0
+        for area in areas:
+            found[0] += len(world.queryArea(area[0], area[1], area[2], area[3], None, True, -1, False, True))
+    return [round(bestTime(query) / len(areas) * 1000000, 2), found[0]]
+
+def run():
+    maps = [["sparse", 500, 0.5, 8], ["dense", 150, 0.5, 0]]
+    sizes = [[22, 22], [200, 200], [1080, 720]]
+    rows = []
+    for name, tiles, density, clusters in maps:
+        for chunk_size in [100, 400]:
+            world = World(chunk_size, chunk_size)
+            blocks = buildMap(world, tiles, density, clusters)
+            chunks = len(world.chunks)
+            areas = [randomAreas(1000, tiles * TILE, tiles * TILE, [size]) for size in sizes]
+            grid = [runQueries(world, area) for area in areas]
+            build = bestTime(world.buildStatic, 1)
+            bvh = [runQueries(world, area) for area in areas]
+            for i in range(len(sizes)):
+                query = str(sizes[i][0]) + "x" + str(sizes[i][1])
+                rows.append([name, blocks, chunk_size, chunks, query, grid[i][0], bvh[i][0], round(build * 1000, 1), grid[i][1] == bvh[i][1]])
+    printTable(["map", "blocks", "chunk", "chunks", "query", "grid us/query", "bvh us/query", "bvh build ms", "same"], rows)
+
+if __name__ == "__main__":
+    run()
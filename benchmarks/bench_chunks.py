@@ -0,0 +1,23 @@
+#tunes the chunk size (see pycol.World.tuneChunkSize) on a sparse and a dense map, comparing the size picked by the
+#estimate with the size picked by timing the queries and the query time with the default 100x100 chunks
+from pycol import World
+from benchmarks import bestTime, randomAreas, printTable
+from benchmarks.bench_bvh import buildMap, runQueries, TILE
+
+def run():
+    maps = [["sparse", 500, 0.5, 8], ["dense", 150, 0.5, 0]]
+    rows = []
+    for name, tiles, density, clusters in maps:
+        world = World(100, 100)
+        blocks = buildMap(world, tiles, density, clusters)
+        areas = randomAreas(1000, tiles * TILE, tiles * TILE, [[22, 22], [64, 64], [200, 200]])
+        default = runQueries(world, areas)[0]
+        estimated = world.tuneChunkSize(areas)
+        estimated_time = runQueries(world, areas)[0]
+        timed = world.tuneChunkSize(areas, None, True)
+        timed_time = runQueries(world, areas)[0]
+        rows.append([name, blocks, default, estimated[0], estimated_time, timed[0], timed_time])
+    printTable(["map", "blocks", "100 us/query", "estimated size", "us/query", "timed size", "us/query"], rows)
+
+if __name__ == "__main__":
+    run()
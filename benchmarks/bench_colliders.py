@@ -0,0 +1,66 @@
+#times the player's update (its collision checks and move) per frame with the walls merged in to colliders (see Level.bakeColliders)
+#and with each wall left as its own block, on maptest.tmd and generated maps. The player runs right and jumps every half second.
+#also counts the solid blocks that don't move the player can collide with.
+import json, time
+from benchmarks import syntheticMap, printTable
+
+TICKS = 1000
+
+#counts the solid blocks that don't move the player can collide with, in the tile grid, the chunks and the BVH
+def solidCount(level):
+    count = 0
+    if level.tile_grid != None:
+        count = len([block for block in level.tile_grid.blocks if block != None and block.solid])
+    for block in level.block_set:
+        if not block.dynamic and block.solid and (block.chunk_span != None or block.bvh_index != None):
+            count += 1
+    return count
+
+#runs the level for TICKS ticks, returns the mean time of the player's update in ms
+def playerTime(game, level):
+    import pylevel
+    from headless_main import InputScript
+    script = InputScript([[0, TICKS, "d"]] + [[tick, tick + 5, "w"] for tick in range(0, TICKS, 60)])
+    taken = [0]
+    update = pylevel.Player.update
+    def timed(player, elapsed):
+        start = time.perf_counter()
+        result = update(player, elapsed)
+        taken[0] += time.perf_counter() - start
+        return result
+    pylevel.Player.update = timed
+    try:
+        for tick in range(TICKS):
+            script.apply(game, tick)
+            game.update(game.step_time)
+    finally:
+        pylevel.Player.update = update
+        game.pressed = None
+    return taken[0] * 1000 / TICKS
+
+def run():
+    import random, game_main
+    from pyani import SteppedClock
+    from pylevel import Level
+    game = game_main.game
+    clock = game.clock
+    bake_colliders = game.bake_colliders
+    maps = [["maptest", json.load(open("res/levels/maptest.tmd"))]]
+    for size in [50, 100, 200]:
+        maps.append([str(size) + "x" + str(size), syntheticMap(size, size)])
+    rows = []
+    for name, data in maps:
+        results = []
+        for bake in [False, True]:
+            game.bake_colliders = bake
+            game.clock = SteppedClock()
+            random.seed(0)
+            level = game.loadLevel(None, None, data, Level.JSON_LOAD)
+            results.append([solidCount(level), playerTime(game, level), [round(level.player.x), round(level.player.y)]])
+        rows.append([name, results[0][0], results[1][0], round(results[0][1], 4), round(results[1][1], 4), round(results[0][1] / results[1][1], 2), results[0][2] == results[1][2]])
+    game.bake_colliders = bake_colliders
+    game.clock = clock
+    printTable(["map", "solid", "baked solid", "move ms", "baked move ms", "speedup", "same path"], rows)
+
+if __name__ == "__main__":
+    run()
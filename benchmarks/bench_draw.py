@@ -0,0 +1,29 @@
+#times drawing a frame of generated maps of increasing size with the camera in the middle of the level,
+#culled (Level.draw, only what's in the draw cells on screen) against drawing every decoration and block.
+from benchmarks import bestTime, syntheticMap, printTable
+
+def run():
+    import game_main
+    from pylevel import Level, drawOrder
+    game = game_main.game
+    screen = game.screen
+    rows = []
+    for size in [50, 100, 200]:
+        level = game.loadLevel(None, None, syntheticMap(size, size), Level.JSON_LOAD, False)
+        level.player.x = level.map_width / 2
+        level.player.y = level.map_height / 2
+        level.updateCamera()
+        drawn = [0]
+        def culled():
+            drawn[0] = level.draw(screen)
+        def everything():
+            level.drawDecorations(screen, level.offset)
+            for block in sorted(level.block_set, key = drawOrder):
+                block.draw(screen, level.offset)
+        culled_time = bestTime(culled)
+        all_time = bestTime(everything)
+        rows.append([str(size) + "x" + str(size), len(level.decorations) + len(level.block_set), drawn[0], round(all_time * 1000, 2), round(culled_time * 1000, 2)])
+    printTable(["map", "objects", "drawn", "draw all ms", "culled ms"], rows)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,20 @@
+#measures how long it takes to load a level from its JSON data, for res/levels/maptest.tmd and generated 200x200 maps
+import os, json
+from benchmarks import bestTime, syntheticMap, printTable
+
+def run():
+    import game_main
+    from pylevel import Level
+    game = game_main.game
+    maps = [["maptest.tmd", json.load(open(os.path.join("res", "levels", "maptest.tmd")))]]
+    for density in [0.1, 0.3, 0.6]:
+        maps.append(["200x200 (" + str(density) + " walls)", syntheticMap(200, 200, density)])
+    rows = []
+    for name, dat in maps:
+        taken = bestTime(lambda: game.loadLevel(None, None, dat, Level.JSON_LOAD, False), 3)
+        tiles = dat[0] * dat[1]
+        rows.append([name, tiles, round(taken * 1000, 1), round(taken * 1000000 / tiles, 1)])
+    printTable(["map", "tiles", "load ms", "us/tile"], rows)
+
+if __name__ == "__main__":
+    run()
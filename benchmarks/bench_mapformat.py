@@ -0,0 +1,51 @@
+#compares the size and parse time of levels in the .tmd JSON format and the binary format (see pymap)
+#JSON parsing is json.loads and splitting every tile's text, which is what Level.load_JSON has to do before it can build the level.
+#for the binary format "unpack" is decoding the file (pymap.unpack) and "tiles" is also listing every tile (LevelMap.tiles)
+import os, json
+import pymap
+from benchmarks import bestTime, syntheticMap, printTable
+
+#parses a JSON level the way Level.load_JSON does, returns the number of tiles
+def parseJSON(data):
+    info = json.loads(data.decode("utf-8"))
+    tiles = 0
+    for column in info[2]:
+        for layers in column:
+            for text in layers[:10]:
+                if text != "None":
+                    data = text.split(":")
+                    tileinfo = {}
+                    for i in range(5, len(data)):
+                        infodat = data[i].split(";")
+                        tileinfo[infodat[0]] = infodat[1]
+                    tiles += 1
+    return tiles
+
+def parseMap(data):
+    return len(pymap.unpack(data).tiles())
+
+#pads every cell to the 10 layers the editor saves
+def editorLayers(info):
+    for column in info[2]:
+        for layers in column:
+            layers.extend(["None"] * (10 - len(layers)))
+    return info
+
+def run():
+    maps = [["maptest.tmd", json.load(open(os.path.join("res", "levels", "maptest.tmd")))]]
+    for density in [0.1, 0.3, 0.6]:
+        maps.append(["200x200 (" + str(density) + " walls)", editorLayers(syntheticMap(200, 200, density))])
+    rows = []
+    for name, info in maps:
+        json_data = json.dumps(info).encode("utf-8")
+        map_data = pymap.pack(info)
+        assert parseJSON(json_data) == parseMap(map_data)
+        json_time = bestTime(lambda: parseJSON(json_data))
+        map_time = bestTime(lambda: parseMap(map_data))
+        unpack_time = bestTime(lambda: pymap.unpack(map_data))
+        rows.append([name, len(json_data), len(map_data), round(len(json_data) / len(map_data), 1), round(json_time * 1000, 2),
+                     round(unpack_time * 1000, 3), round(json_time / unpack_time), round(map_time * 1000, 2), round(json_time / map_time, 1)])
+    printTable(["map", "JSON bytes", "binary bytes", "smaller", "JSON parse ms", "unpack ms", "faster", "unpack+tiles ms", "faster"], rows)
+
+if __name__ == "__main__":
+    run()
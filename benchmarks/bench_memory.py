@@ -0,0 +1,34 @@
+#measures the memory used per block and the time taken to build a level from synthetic 100x100 and 500x500 maps
+import sys, time, random, tracemalloc
+from benchmarks import syntheticMap, printTable
+
+def run():
+    import game_main
+    from pylevel import Level, Wall
+    game = game_main.game
+    rows = []
+    for size in [100, 500]:
+        dat = syntheticMap(size, size)
+        random.seed(0)
+        tracemalloc.start()
+        start = time.perf_counter()
+        level = game.loadLevel(None, None, dat, Level.JSON_LOAD, False)
+        taken = time.perf_counter() - start
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        blocks = len(level.block_set)
+        wall = level.blocks[1][0]
+        for block in level.blocks[1]:
+            if isinstance(block, Wall):
+                wall = block
+                break
+        #the size of the block object itself (and its __dict__ if it has one)
+        wall_size = sys.getsizeof(wall)
+        if hasattr(wall, "__dict__"):
+            wall_size += sys.getsizeof(wall.__dict__)
+        rows.append([str(size) + "x" + str(size), blocks, len(level.decorations), round(taken, 2), round(used / 1024 / 1024, 1), round(used / (blocks + len(level.decorations))), wall_size])
+        del level
+    printTable(["map", "blocks", "decorations", "load s", "memory MB", "bytes/object", "bytes/wall object"], rows)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,35 @@
+#times drawing every block in the draw cells on screen with the camera in the middle of generated maps, each block blitting on to the screen itself
+#against adding them to the game's RenderQueue which culls, sorts and draws them with one Surface.blits call per priority layer.
+from benchmarks import bestTime, syntheticMap, printTable
+
+def run():
+    import game_main
+    from pylevel import Level, drawOrder
+    game = game_main.game
+    screen = game.screen
+    rows = []
+    for size in [50, 100, 200]:
+        level = game.loadLevel(None, None, syntheticMap(size, size), Level.JSON_LOAD, False)
+        level.player.x = level.map_width / 2
+        level.player.y = level.map_height / 2
+        level.updateCamera()
+        offset = level.offset
+        blocks = list(level.moving)
+        for chunk in level.visibleChunks(offset.x, offset.y, screen.get_width(), screen.get_height()):
+            blocks.extend(chunk[1])
+        def eachBlock():
+            for block in sorted(blocks, key = drawOrder):
+                block.draw(screen, offset)
+        blits = [0]
+        def queued():
+            queue = game.render_queue.begin(screen, offset, level.draw_margin)
+            for block in blocks:
+                queue.add(block)
+            blits[0] = queue.flush()
+        each_time = bestTime(eachBlock)
+        queued_time = bestTime(queued)
+        rows.append([str(size) + "x" + str(size), len(blocks), blits[0], round(each_time * 1000, 2), round(queued_time * 1000, 2)])
+    printTable(["map", "blocks", "blits", "each ms", "queued ms"], rows)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,57 @@
+#compares starting a level from a region file (only the regions around the spawn are loaded) with loading the whole level,
+#for generated maps of increasing size, then walks the player across the biggest one to time loading and unloading regions.
+import os, gc, time, tempfile, tracemalloc
+import pymap
+from benchmarks import syntheticMap, printTable
+
+#loads the level file and returns [seconds taken, bytes of memory used, the level]
+def measureLoad(game, filename):
+    tracemalloc.start()
+    start = time.perf_counter()
+    level = game.loadLevelFile(None, None, filename, False)
+    taken = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return [taken, used, level]
+
+def run():
+    import game_main
+    game = game_main.game
+    folder = tempfile.mkdtemp()
+    rows = []
+    level = None
+    for size in [100, 300, 1000]:
+        info = syntheticMap(size, size)
+        region_name = os.path.join(folder, str(size) + ".pmr")
+        pymap.saveRegions(region_name, info)
+        taken, used, level = measureLoad(game, region_name)
+        rows.append([str(size) + "x" + str(size), "regions", os.path.getsize(region_name), round(taken * 1000, 1), round(used / 1024 / 1024, 1), len(level.block_set)])
+        #loading the whole of the biggest map takes too long to be worth waiting for
+        if size <= 300:
+            map_name = os.path.join(folder, str(size) + ".pmd")
+            pymap.save(map_name, info)
+            taken, used, whole = measureLoad(game, map_name)
+            rows.append([str(size) + "x" + str(size), "whole", os.path.getsize(map_name), round(taken * 1000, 1), round(used / 1024 / 1024, 1), len(whole.block_set)])
+            del whole
+        del info
+    printTable(["map", "load", "file bytes", "start ms", "memory MB", "blocks"], rows)
+
+    #the levels loaded before are still waiting to be collected, don't let that land in the middle of the walk
+    gc.collect()
+    #moves the player (and the screen with it) diagonally across the biggest map, 8 pixels a frame (about as fast as the player falls)
+    times = []
+    most = 0
+    for step in range(0, 30000, 8):
+        level.player.x = step
+        level.player.y = step
+        level.offset.x = step - 500
+        level.offset.y = step - 300
+        start = time.perf_counter()
+        level.streamRegions()
+        times.append(time.perf_counter() - start)
+        most = max(most, len(level.block_set))
+    print("")
+    print("walking across 1000x1000: " + str(len(times)) + " frames, mean " + str(round(sum(times) / len(times) * 1000, 2)) + " ms, worst " + str(round(max(times) * 1000, 1)) + " ms per frame, at most " + str(most) + " blocks loaded")
+
+if __name__ == "__main__":
+    run()
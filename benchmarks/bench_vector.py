@@ -0,0 +1,56 @@
+#times one physics step (the velocity/acceleration update done by Player.update and Skull.update in pylevel)
+#written with the allocating Vector methods (addVec, mult, capVector) and with the in-place ones (iadd, clamp),
+#and counts the vectors each one creates
+from pycol import Vector
+from benchmarks import bestTime, printTable
+
+STEPS = 100000
+ELAPSED = 1 / 60
+
+#the step as it used to be written, a new vector for every operation
+def allocatingStep(body):
+    body[0] = body[0].addVec(body[1].mult(ELAPSED))
+    body[0] = body[0].capVector(body[2])
+    diff = body[0].mult(ELAPSED)
+    return diff.x + diff.y
+
+#the same step done in place
+def inPlaceStep(body):
+    vel = body[0]
+    vel.iadd(body[1].x * ELAPSED, body[1].y * ELAPSED)
+    vel.clamp(body[2])
+    return vel.x * ELAPSED + vel.y * ELAPSED
+
+#[velocity, acceleration, terminal velocity] like the player's
+def newBody():
+    return [Vector(200, -370), Vector(600, 980), Vector(200, 1500)]
+
+#counts the vectors created while running func
+def countVectors(func):
+    count = [0]
+    init = Vector.__init__
+    def countedInit(self, x, y):
+        count[0] += 1
+        init(self, x, y)
+    Vector.__init__ = countedInit
+    try:
+        func()
+    finally:
+        Vector.__init__ = init
+    return count[0]
+
+def run():
+    rows = []
+    for name, step in [["allocating", allocatingStep], ["in place", inPlaceStep]]:
+        body = newBody()
+        def steps():
+            for i in range(STEPS):
+                step(body)
+        taken = bestTime(steps)
+        body = newBody()
+        vectors = countVectors(steps)
+        rows.append([name, round(taken / STEPS * 1000000000), round(vectors / STEPS, 2)])
+    printTable(["step", "ns/step", "vectors/step"], rows)
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,197 @@
+#the benchmark suite, times the hot paths of the engine, the level, the resources and the editor on generated maps of increasing size
+#with fixed seeds so two runs can be compared (see benchmarks/__main__.py). Every result is the best time of a few runs in milliseconds.
+import sys, json, random, platform
+from pycol import World, Block
+from benchmarks import bestTime, randomAreas, syntheticMap, printTable
+from benchmarks.bench_bvh import buildMap, TILE
+
+#the map sizes (in tiles) the benchmarks are run on
+SIZES = [50, 100, 200]
+#flooding in the editor takes much longer than the rest, so its maps are kept smaller
+EDITOR_SIZES = [25, 50, 75]
+#how many ticks the level is run for in the tick benchmarks
+TICKS = 100
+
+#block that moves, for the move and updateChunks benchmarks
+class Mover(Block):
+    dynamic = True
+
+    def get_type(self):
+        return "mover"
+
+#the results are named "group/case/size"
+def resultName(group, case, size):
+    return group + "/" + case + "/" + str(size) + "x" + str(size)
+
+def ms(seconds):
+    return round(seconds * 1000, 4)
+
+#World.checkAndReturnArea, Block.move and Block.updateChunks on a map of walls over 30% of the tiles
+def benchCollision(sizes):
+    results = {}
+    for size in sizes:
+        world = World(100, 100)
+        buildMap(world, size, 0.3, 0)
+        areas = randomAreas(1000, size * TILE, size * TILE, [[22, 22], [64, 64], [200, 200]])
+        def query():
+            for area in areas:
+                world.checkAndReturnArea(area[0], area[1], area[2], area[3], None, True, None, False, True)
+        results[resultName("collision", "checkAndReturnArea", size)] = ms(bestTime(query))
+
+        rand = random.Random(0)
+        movers = []
+        for i in range(200):
+            mover = Mover(world, rand.uniform(0, (size - 1) * TILE), rand.uniform(0, (size - 1) * TILE), 20, 30, world.nextID())
+            mover.updateChunks()
+            movers.append([mover, rand.uniform(-40, 40), rand.uniform(-40, 40)])
+        #each mover goes there and back so every run does the same thing
+        def move():
+            for mover, dx, dy in movers:
+                mover.move(dx, dy)
+                mover.move(-dx, -dy)
+        results[resultName("collision", "move", size)] = ms(bestTime(move))
+        def updateChunks():
+            for mover, dx, dy in movers:
+                mover.x += dx
+                mover.updateChunks()
+                mover.x -= dx
+                mover.updateChunks()
+        results[resultName("collision", "updateChunks", size)] = ms(bestTime(updateChunks))
+    return results
+
+#Level.load_JSON (making the whole level), Level.restart and Level.tick with and without drawing
+def benchLevel(sizes):
+    import game_main
+    from pyani import SteppedClock
+    from pylevel import Level
+    game = game_main.game
+    clock = game.clock
+    game.clock = SteppedClock()
+    results = {}
+    for size in sizes:
+        data = syntheticMap(size, size)
+        level = [None]
+        def load():
+            random.seed(0)
+            level[0] = game.loadLevel(None, None, data, Level.JSON_LOAD)
+        results[resultName("level", "load_JSON", size)] = ms(bestTime(load, 3))
+        level = level[0]
+        results[resultName("level", "restart", size)] = ms(bestTime(level.restart))
+        #the ticks run on from each other, the level is restarted first so they start in the same place
+        def tick():
+            for i in range(TICKS):
+                game.clock.advance(game.step_time)
+                level.tick(game.step_time, False)
+        def step():
+            for i in range(TICKS):
+                game.clock.advance(game.step_time)
+                level.step(game.step_time, False)
+        level.restart()
+        results[resultName("level", "tick_draw_" + str(TICKS), size)] = ms(bestTime(tick, 3))
+        level.restart()
+        results[resultName("level", "tick_" + str(TICKS), size)] = ms(bestTime(step, 3))
+    game.clock = clock
+    return results
+
+#ImageManager.loadTiles with and without scaling to the tile size and AnimationSet construction
+def benchResources(sizes):
+    import pygame, game_main
+    from pyani import ImageManager, AnimationSet
+    results = {}
+    image = pygame.image.load("res/imgs/buttons.png")
+    def loadScaled():
+        ImageManager(game_main.TileSizer(24, 24)).loadTiles(image, 10, 8, "buttons")
+    def loadTiles():
+        ImageManager().loadTiles(image, 10, 8, "buttons")
+    results["resources/loadTiles_scaled/80"] = ms(bestTime(loadScaled))
+    results["resources/loadTiles/80"] = ms(bestTime(loadTiles))
+    info = []
+    for direction in range(4):
+        for doorid in range(10):
+            info.append("up_" + str(direction) + "_" + str(doorid) + ":buttons," + str(doorid * 2) + ",100")
+            info.append("down_" + str(direction) + "_" + str(doorid) + ":buttons," + str(doorid * 2 + 1) + ",100;buttons," + str(doorid * 2) + ",100")
+    manager = game_main.game.tilemanager
+    def construct():
+        for i in range(100):
+            AnimationSet(manager, info)
+    results["resources/AnimationSet_x100/80"] = ms(bestTime(construct))
+    return results
+
+#editor_main.Map.flood, Map.draw and Map.pack_info on the editor's version of the generated maps
+def benchEditor(sizes):
+    import pygame, editor_main
+    results = {}
+    target = pygame.Surface((832, 680))
+    for size in sizes:
+        #the editor keeps all 10 layers of every tile in its maps
+        data = syntheticMap(size, size)
+        data[2] = [[cell + ["None"] * (10 - len(cell)) for cell in column] for column in data[2]]
+        tilemap = editor_main.createMap(data, [32, 32], [64, 64], None)
+        tilemap.im.loadResourceFile("res/imgs/tiledat.res")
+        #the flood goes over every tile in the map, painting the empty ones empty again so every run does the same thing
+        def flood():
+            tilemap.flood([None, 0], [1, 2], 0, True)
+        results[resultName("editor", "flood", size)] = ms(bestTime(flood, 3))
+        def draw():
+            tilemap.draw(target, [0, 0], 9)
+        results[resultName("editor", "draw", size)] = ms(bestTime(draw))
+        results[resultName("editor", "pack_info", size)] = ms(bestTime(tilemap.pack_info))
+    return results
+
+#the groups of benchmarks, [name, function, map sizes]
+BENCHMARKS = [["collision", benchCollision, SIZES],
+              ["level", benchLevel, SIZES],
+              ["resources", benchResources, None],
+              ["editor", benchEditor, EDITOR_SIZES]]
+
+#runs the benchmark groups with the given names (all of them if None), returns the results as a dict ready to be saved as JSON
+def runSuite(names = None):
+    import pygame
+    results = {}
+    for name, bench, sizes in BENCHMARKS:
+        if names == None or name in names:
+            results.update(bench(sizes))
+    return {"python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "results": results}
+
+def saveResults(data, filename):
+    f = open(filename, "w")
+    json.dump(data, f, indent = 1, sort_keys = True)
+    f.close()
+
+def loadResults(filename):
+    f = open(filename)
+    data = json.load(f)
+    f.close()
+    return data
+
+#prints the results of one run, or how new compares to old if old is given. Results that are more than threshold
+#slower are marked, returns the names of those results
+def printResults(new, old = None, threshold = 0.1):
+    rows = []
+    slower = []
+    for name in sorted(new["results"].keys()):
+        time = new["results"][name]
+        if old == None:
+            rows.append([name, time])
+        elif name in old["results"]:
+            old_time = old["results"][name]
+            change = 0
+            if old_time > 0:
+                change = (time - old_time) / old_time
+            mark = ""
+            if change > threshold:
+                mark = "slower"
+                slower.append(name)
+            elif change < -threshold:
+                mark = "faster"
+            rows.append([name, old_time, time, str(round(change * 100, 1)) + "%", mark])
+        else:
+            rows.append([name, "-", time, "new", ""])
+    if old == None:
+        printTable(["benchmark", "ms"], rows)
+    else:
+        printTable(["benchmark", "old ms", "new ms", "change", ""], rows)
+    return slower
@@ -1,4 +1,4 @@
-import pygame, math, sys, random, json, os
+import pygame, math, sys, random, json, os, pymap
 import game_main
 
 pygame.init()
@@ -158,7 +158,19 @@ class Tile:
                 str_rep = str_rep + ":" + str(key) + ";" + str(self.info[key])
         return str_rep
 
+#info is either the JSON format ([width, height, grid], see Map.pack_info), a pymap.LevelMap or a pymap.RegionFile
 def createMap(info, tile_size, icon_size, im):
+    if isinstance(info, pymap.LevelMap) or isinstance(info, pymap.RegionFile):
+        tilemap = Map([info.width, info.height], tile_size, icon_size, im)
+        for x, y, z, name, iid, tileinfo in info.tiles():
+            paint = [name, iid]
+            if paint[0] == "None":
+                paint[0] = None
+            tile = tilemap.paint(paint, z, None, [x, y])
+            old_info = tile.info
+            tile.info = dict(tileinfo)
+            tile.info.update(old_info)
+        return tilemap
     width = info[0]
     height = info[1]
     strgrid = info[2]
@@ -1198,16 +1210,30 @@ def fixName(name):
         name = name + '.tmd'
     return name
 
+#names ending in .pmd are saved in the binary format and .pmr as a region file (see pymap), anything else as JSON
 def save(name):
-    f = open(fixName(name), 'w')
+    name = fixName(name)
+    if name.endswith(".pmd"):
+        pymap.save(name, main.tilemap.pack_info())
+        return
+    if name.endswith(".pmr"):
+        pymap.saveRegions(name, main.tilemap.pack_info())
+        return
+    f = open(name, 'w')
     json.dump(main.tilemap.pack_info(), f)
     f.close()
 
+#loads either format, the binary one is recognised by its header
 def load(name):
-    f = open(fixName(name))
-    data = json.load(f)
-    main.load(data)
+    f = open(fixName(name), 'rb')
+    data = f.read()
     f.close()
+    if pymap.isMap(data):
+        main.load(pymap.unpack(data))
+    elif pymap.isRegions(data):
+        main.load(pymap.RegionFile(fixName(name)))
+    else:
+        main.load(json.loads(data.decode("utf-8")))
 
 #tile_select @ [20, 200], size: [64, 500]
 #id_select @ [124, 200], size: [64, 500]
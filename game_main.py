@@ -80,16 +80,29 @@ for direction in range(4):
 game.addAnimationSet("button", AnimationSet(game.tilemanager, button_anisets))
                                                                
 
+#handles the keys for the level rather than the player, q toggles the red and green walls and r restarts
+def keyDown(key):
+    if key == pygame.K_q:
+        game.level.state = game.level.state+1
+        if game.level.state > 2:
+            game.level.state = 1
+    elif key == pygame.K_r:
+        game.level.killPlayer()
+
+#the most frames drawn a second, the game sleeps between frames to keep under it (0 draws as many as it can)
+MAX_FPS = 120
+
 #runs the game, mapname is the filename to load the map from
 #level name, world name are the names of the world and level used for saving your record (see level_selector)
-def run(mapname, levelname = None, worldname = None):
+#max_fps is the frame cap (see MAX_FPS), the level itself is updated at the game's physics_rate however many frames are drawn (see Game.update)
+def run(mapname, levelname = None, worldname = None, max_fps = MAX_FPS):
     mapname = "res/levels/" + mapname
     game.reloadScreen()
-    game.loadLevel(levelname, worldname, json.load(open(mapname)), Level.JSON_LOAD)
+    game.loadLevelFile(levelname, worldname, mapname)
 
     fps_timer = pygame.time.get_ticks()
     cur_frames = 0
-    last_tick = pygame.time.get_ticks()
+    clock = pygame.time.Clock()
     running = True
     #main loop of the game
     while running and not game.finished:
@@ -98,18 +111,13 @@ def run(mapname, levelname = None, worldname = None):
                 running = False
                 break
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_q:
-                    game.level.state = game.level.state+1
-                    if game.level.state > 2:
-                        game.level.state = 1
-                elif event.key == pygame.K_r:
-                    game.level.killPlayer()
+                keyDown(event.key)
                 
             game.call(event)
                 
-        elapsed = pygame.time.get_ticks() - last_tick
-        last_tick = pygame.time.get_ticks()
-        game.tick(elapsed/1000)
+        elapsed = clock.tick(max_fps)
+        game.update(elapsed/1000)
+        game.render()
         cur_frames+=1
 
         if pygame.time.get_ticks() - fps_timer >= 1000:
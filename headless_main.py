@@ -0,0 +1,159 @@
+import os, sys, json, time, random, argparse, tracemalloc
+#no window is opened, SDL draws in to memory instead
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+#keeps pygame's greeting out of the JSON
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame, game_main
+from pyani import SteppedClock
+from pylevel import Level
+from benchmarks import syntheticMap
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#runs levels without a window, as fast as they can be updated, and prints how long they took as JSON. Run it from the repository root:
+#   python headless_main.py                          every level in res/levels/leveldat.json
+#   python headless_main.py maptest.tmd --ticks 5000 a level file in res/levels/ (any format, see Game.loadLevelFile)
+#   python headless_main.py --synthetic 200x200      a generated map (see benchmarks.syntheticMap)
+#the game's clock is stepped with the level (see pyani.SteppedClock) so the same level and input always do the same thing.
+#the input script is a JSON list of [start_tick, end_tick, key] with key a pygame key name without the K_ ("d", "w", "LEFT", "q"),
+#the key is pressed on start_tick and held until end_tick
+
+#the keys held down for the player, indexed like pygame.key.get_pressed (see Game.getPressed)
+class KeyState:
+    def __init__(self, keys = None):
+        if keys == None:
+            keys = set()
+        self.keys = keys
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+#plays an input script (see above) one tick at a time
+class InputScript:
+    def __init__(self, script):
+        self.script = [[start, end, getattr(pygame, "K_" + key)] for start, end, key in script]
+
+    #presses and holds the keys for the tick
+    def apply(self, game, tick):
+        held = set()
+        for start, end, key in self.script:
+            if start == tick:
+                game_main.keyDown(key)
+                game.call(pygame.event.Event(pygame.KEYDOWN, key = key))
+            if start <= tick and tick < end:
+                held.add(key)
+        game.pressed = KeyState(held)
+
+#gets the value at fraction of the way through the sorted list values
+def percentile(values, fraction):
+    return values[int(round(fraction * (len(values) - 1)))]
+
+#loads a level with load (a function that loads it in to the game) and updates it for the given number of ticks,
+#drawing each one if draw is True. returns the results for name as a dict.
+#if trace_memory is True the most memory used while loading is traced as well, which makes the load slower
+def runLevel(name, load, ticks, script = None, draw = False, seed = 0, trace_memory = False):
+    game = game_main.game
+    game.clock = SteppedClock()
+    game.pressed = KeyState()
+    game.paused = False
+    game.finished = False
+    random.seed(seed)
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    level = load()
+    load_time = time.perf_counter() - start
+    load_peak = None
+    if trace_memory:
+        load_peak = round(tracemalloc.get_traced_memory()[1] / 1024.0 / 1024.0, 2)
+        tracemalloc.stop()
+
+    level.query_count = 0
+    times = []
+    for tick in range(ticks):
+        if script != None:
+            script.apply(game, tick)
+        start = time.perf_counter()
+        game.update(game.step_time)
+        if draw:
+            game.render()
+        times.append(time.perf_counter() - start)
+    queries = level.query_count
+    game.pressed = None
+
+    times.sort()
+    result = {"level": name,
+              "load_s": round(load_time, 4),
+              "blocks": len(level.block_set),
+              "ticks": ticks,
+              "player": None,
+              "tick_mean_ms": round(1000 * sum(times) / max(1, len(times)), 4),
+              "tick_p95_ms": None,
+              "tick_p99_ms": None,
+              "queries": queries,
+              "queries_per_tick": round(queries / max(1, ticks), 2),
+              "load_peak_mb": load_peak,
+              "peak_rss_mb": None}
+    if len(times) > 0:
+        result["tick_p95_ms"] = round(1000 * percentile(times, 0.95), 4)
+        result["tick_p99_ms"] = round(1000 * percentile(times, 0.99), 4)
+    if level.player != None:
+        result["player"] = [round(level.player.x, 3), round(level.player.y, 3)]
+    if resource != None:
+        #kilobytes on linux, bytes on mac
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            rss = rss / 1024.0
+        result["peak_rss_mb"] = round(rss / 1024.0, 2)
+    return result
+
+#gets [name, mapfile] for every level in leveldat.json (see level_selector)
+def listLevels():
+    f = open("res/levels/leveldat.json")
+    data = json.load(f)
+    f.close()
+    levels = []
+    for world in data["WORLD_ORDER"]:
+        for level in data[world]["LEVEL_ORDER"]:
+            levels.append([world + "/" + level, data[world][level][0]])
+    return levels
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "runs levels without a window and prints how long they took as JSON")
+    parser.add_argument("levels", nargs = "*", help = "level files in res/levels/, every level in leveldat.json if none are given")
+    parser.add_argument("--synthetic", action = "append", default = [], metavar = "WxH", help = "also run a generated map of this size")
+    parser.add_argument("--ticks", type = int, default = 1000, help = "how many ticks to run each level for")
+    parser.add_argument("--input", help = "JSON input script to play (see the top of headless_main.py)")
+    parser.add_argument("--draw", action = "store_true", help = "draw every tick as well")
+    parser.add_argument("--trace-memory", action = "store_true", help = "trace the most memory used while loading (slows the load down)")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed for the random background tiles")
+    args = parser.parse_args(argv)
+
+    game = game_main.game
+    script = None
+    if args.input != None:
+        f = open(args.input)
+        script = InputScript(json.load(f))
+        f.close()
+
+    runs = []
+    for mapname in args.levels:
+        runs.append([mapname, mapname])
+    if len(args.levels) == 0 and len(args.synthetic) == 0:
+        runs = listLevels()
+    results = []
+    for name, mapname in runs:
+        load = lambda: game.loadLevelFile(None, None, "res/levels/" + mapname)
+        results.append(runLevel(name, load, args.ticks, script, args.draw, args.seed, args.trace_memory))
+    for size in args.synthetic:
+        width, height = [int(n) for n in size.lower().split("x")]
+        data = syntheticMap(width, height)
+        load = lambda: game.loadLevel(None, None, data, Level.JSON_LOAD)
+        results.append(runLevel("synthetic " + size, load, args.ticks, script, args.draw, args.seed, args.trace_memory))
+    print(json.dumps(results, indent = 1))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import os, re, json, math, random, argparse
+import pymap
+
+#generates big levels for testing how the game copes with size, the same parameters and seed always make the same level.
+#run it from the repository root, the level is saved in res/levels/ in the format its extension picks (see writeLevel):
+#   python level_generator.py big.tmd --scale 100                 100 times the tiles of maptest.tmd (20x12)
+#   python level_generator.py huge.pmr --scale 10000 --seed 3     a region file, which is only loaded around the player
+#   python level_generator.py big.pmd --width 500 --height 80 --turrets 40 --register "stress/big"
+#any feature count that isn't given goes up with the size of the level (see PER_TILE)
+
+#the size of maptest.tmd, which --scale multiplies the number of tiles of
+BASE_WIDTH = 20
+BASE_HEIGHT = 12
+#how many of each feature there are per tile if the count isn't given, about what maptest.tmd has
+PER_TILE = {"toggle_walls": 1 / 24.0, "turrets": 1 / 120.0, "doors": 1 / 240.0, "saws": 1 / 480.0, "spikes": 1 / 40.0, "checkpoints": 1 / 240.0}
+#how far (in tiles) the corners of the generated saw paths are apart
+SAW_PATH = [2, 6]
+#the medal times (ms) for registered levels (see level_selector)
+DEFAULT_TIMES = "10000,30000,60000"
+
+#gets the width and height (in tiles) of a level with scale times the tiles of maptest.tmd, keeping its shape
+def scaledSize(scale):
+    return [max(4, int(round(BASE_WIDTH * math.sqrt(scale)))), max(4, int(round(BASE_HEIGHT * math.sqrt(scale))))]
+
+#the text of a tile in the .tmd format (see editor_main.Tile), props is a list of [key, value]
+def tileText(x, y, name, iid, props = None):
+    text = str(x) + ":" + str(y) + ":0:" + name + ":" + str(iid)
+    if props != None:
+        for key, value in props:
+            text = text + ":" + key + ";" + str(value)
+    return text
+
+#makes a level in the .tmd format ([width, height, grid], see Level.load_JSON), with one layer per tile.
+#the level has a wall around the edge, walls over density of the tiles inside, the spawn in the bottom left and the finish in the top right,
+#then the features on empty tiles: toggle walls (blocks 1 and 3, like in maptest.tmd), turrets facing one of turret_directions (0 = up, 1 = right, 2 = down, 3 = left), doors with the buttons
+#that open them, saws, spikes and checkpoints. Each saw is a closed path of saw_block tiles at the corners of a rectangle,
+#saws only exercise the loader and the editor for now as the loader collects their paths without making them (see Level.loadSawBlock)
+def generateLevel(width, height, density = 0.3, toggle_walls = 0, turrets = 0, turret_directions = None, doors = 0, saws = 0, spikes = 0, checkpoints = 0, seed = 0):
+    if width < 4 or height < 4:
+        raise ValueError("levels have to be at least 4x4 tiles")
+    if turret_directions == None:
+        turret_directions = [0, 1, 2, 3]
+    rand = random.Random(seed)
+    grid = []
+    for x in range(width):
+        column = []
+        for y in range(height):
+            if x == 0 or y == 0 or x == width - 1 or y == height - 1 or rand.random() < density:
+                column.append([tileText(x, y, "blocks", 0)])
+            else:
+                column.append([tileText(x, y, "None", 0)])
+        grid.append(column)
+
+    used = set()
+    #checks if x, y is an empty tile inside the edge
+    def empty(x, y):
+        return x > 0 and y > 0 and x < width - 1 and y < height - 1 and not (x, y) in used and grid[x][y][0].split(":")[3] == "None"
+
+    #places a tile on an empty tile inside the edge, or at x, y if they're given
+    def place(name, iid, props = None, x = None, y = None):
+        if x == None:
+            #only tries for so long on levels that are almost all walls
+            for i in range(1000):
+                x = rand.randrange(1, width - 1)
+                y = rand.randrange(1, height - 1)
+                if empty(x, y):
+                    break
+            else:
+                return False
+        used.add((x, y))
+        grid[x][y][0] = tileText(x, y, name, iid, props)
+        return True
+
+    place("spawn", 0, None, 1, height - 2)
+    place("flag", 1, None, width - 2, 1)
+    for i in range(toggle_walls):
+        place("blocks", rand.choice([1, 3]))
+    for i in range(turrets):
+        place("turrets", rand.choice(turret_directions))
+    #doors and buttons are paired by their doorid, there are 10 colours so they're shared after that
+    for i in range(doors):
+        doorid = i % 10
+        place("door", rand.randrange(4), [["doorid", doorid]])
+        place("button", (rand.randrange(2) * 20) + (doorid * 2))
+    #the corners are numbered going round the rectangle, the saw goes back to the first one after the last
+    saw_id = 0
+    for i in range(saws):
+        for attempt in range(1000):
+            x0 = rand.randrange(1, width - 1)
+            y0 = rand.randrange(1, height - 1)
+            x1 = x0 + rand.randint(SAW_PATH[0], SAW_PATH[1])
+            y1 = y0 + rand.randint(SAW_PATH[0], SAW_PATH[1])
+            corners = [[x0, y0], [x1, y0], [x1, y1], [x0, y1]]
+            if all(empty(x, y) for x, y in corners):
+                for pos in range(len(corners)):
+                    place("saw_block", 0, [["saw_id", saw_id], ["path_length", len(corners)], ["saw_pos", pos], ["speed", 100], ["radius", 16]], corners[pos][0], corners[pos][1])
+                saw_id += 1
+                break
+    for i in range(spikes):
+        place("spikes", 0)
+    for i in range(checkpoints):
+        place("flag", 0)
+    return [width, height, grid]
+
+#saves a level from generateLevel to filename, .pmd is the binary format, .pmr a region file and anything else .tmd JSON (see pymap).
+#the JSON is written a column at a time with the empty layers filled in, as the editor expects all 10 layers of every tile
+def writeLevel(filename, info):
+    if filename.endswith(".pmd"):
+        pymap.save(filename, info)
+    elif filename.endswith(".pmr"):
+        pymap.saveRegions(filename, info)
+    else:
+        f = open(filename, "w")
+        f.write("[" + str(info[0]) + ", " + str(info[1]) + ", [")
+        for x in range(len(info[2])):
+            if x > 0:
+                f.write(", ")
+            f.write(json.dumps([layers + ["None"] * (10 - len(layers)) for layers in info[2][x]]))
+        f.write("]]")
+        f.close()
+
+#skips the whitespace in text from i, returns where it ends
+def skipSpace(text, i):
+    return re.compile(r"\s*").match(text, i).end()
+
+#finds the keys of the JSON object starting at the { at i in text, without changing how it's written.
+#returns [keys, end] where keys is a list of [key, key_start, value_start, value_end] and end is where the closing } is
+def objectKeys(text, i):
+    decoder = json.JSONDecoder()
+    keys = []
+    i = skipSpace(text, i + 1)
+    while text[i] != "}":
+        key, key_end = decoder.raw_decode(text, i)
+        value_start = skipSpace(text, skipSpace(text, key_end) + 1)
+        value, value_end = decoder.raw_decode(text, value_start)
+        keys.append([key, i, value_start, value_end])
+        i = skipSpace(text, value_end)
+        if text[i] == ",":
+            i = skipSpace(text, i + 1)
+    return [keys, i]
+
+#gets the whitespace at the start of the line the position i in text is on
+def indentAt(text, i):
+    start = text.rfind("\n", 0, i) + 1
+    return re.compile(r"[ \t]*").match(text, start).group()
+
+#adds a level to leveldat.json (see level_selector), name is "world/level" and mapfile is its file in res/levels/.
+#the world is added after the others if it doesn't exist yet. leveldat.json is laid out by hand, so only the parts that
+#change are written and the rest of the file is kept as it is
+def registerLevel(name, mapfile, times = DEFAULT_TIMES, leveldat = "res/levels/leveldat.json"):
+    worldname, levelname = name.split("/", 1)
+    f = open(leveldat)
+    text = f.read()
+    f.close()
+    value = json.dumps([mapfile, times])
+    #the edits are [start, end, new text], made from the end of the file backwards so the positions stay right
+    edits = []
+    top, top_end = objectKeys(text, skipSpace(text, 0))
+    worlds = dict((key[0], key) for key in top)
+    order = json.loads(text[worlds["WORLD_ORDER"][2]:worlds["WORLD_ORDER"][3]])
+    if worldname in worlds:
+        world = worlds[worldname]
+        keys, world_end = objectKeys(text, world[2])
+        levels = dict((key[0], key) for key in keys)
+        if levelname in levels:
+            edits.append([levels[levelname][2], levels[levelname][3], value])
+        else:
+            last = keys[-1]
+            edits.append([last[3], last[3], ",\n" + indentAt(text, last[1]) + json.dumps(levelname) + ":" + value])
+            level_order = json.loads(text[levels["LEVEL_ORDER"][2]:levels["LEVEL_ORDER"][3]])
+            level_order.append(levelname)
+            edits.append([levels["LEVEL_ORDER"][2], levels["LEVEL_ORDER"][3], json.dumps(level_order, separators = (",", ":"))])
+    else:
+        last = top[-1]
+        indent = indentAt(text, last[1])
+        edits.append([last[3], last[3], ",\n" + indent + json.dumps(worldname) + ":{ \"LEVEL_ORDER\":" + json.dumps([levelname]) + ",\n" +
+                      indent + "\t" + json.dumps(levelname) + ":" + value + " }"])
+        order.append(worldname)
+        edits.append([worlds["WORLD_ORDER"][2], worlds["WORLD_ORDER"][3], json.dumps(order, separators = (",", ":"))])
+    edits.sort(key = lambda edit: edit[0], reverse = True)
+    for start, end, new in edits:
+        text = text[:start] + new + text[end:]
+    f = open(leveldat, "w")
+    f.write(text)
+    f.close()
+
+#gets the feature count given on the command line, or the one for the size of the level if it wasn't
+def featureCount(count, name, width, height):
+    if count != None:
+        return count
+    return int(width * height * PER_TILE[name])
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "generates big levels for testing, saved in res/levels/")
+    parser.add_argument("filename", help = "file in res/levels/ to save to, .pmd for binary, .pmr for regions, otherwise .tmd JSON")
+    parser.add_argument("--scale", type = float, help = "make the level this many times the tiles of maptest.tmd")
+    parser.add_argument("--width", type = int, default = BASE_WIDTH, help = "width in tiles (if --scale isn't given)")
+    parser.add_argument("--height", type = int, default = BASE_HEIGHT, help = "height in tiles (if --scale isn't given)")
+    parser.add_argument("--density", type = float, default = 0.3, help = "chance of each tile inside the edge being a wall")
+    parser.add_argument("--toggle-walls", type = int, help = "walls that are switched on and off (blocks 1 and 3)")
+    parser.add_argument("--turrets", type = int)
+    parser.add_argument("--turret-directions", default = "0,1,2,3", help = "directions turrets can face, 0 = up, 1 = right, 2 = down, 3 = left")
+    parser.add_argument("--doors", type = int, help = "door and button pairs")
+    parser.add_argument("--saws", type = int, help = "closed saw paths, only read by the loader and editor (the game doesn't make the saws yet)")
+    parser.add_argument("--spikes", type = int)
+    parser.add_argument("--checkpoints", type = int)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--register", metavar = "WORLD/LEVEL", help = "also add the level to leveldat.json")
+    parser.add_argument("--times", default = DEFAULT_TIMES, help = "medal times in ms for --register")
+    args = parser.parse_args(argv)
+
+    width, height = args.width, args.height
+    if args.scale != None:
+        width, height = scaledSize(args.scale)
+    directions = [int(direction) for direction in args.turret_directions.split(",")]
+    info = generateLevel(width, height, args.density, featureCount(args.toggle_walls, "toggle_walls", width, height),
+                         featureCount(args.turrets, "turrets", width, height), directions,
+                         featureCount(args.doors, "doors", width, height),
+                         featureCount(args.saws, "saws", width, height),
+                         featureCount(args.spikes, "spikes", width, height),
+                         featureCount(args.checkpoints, "checkpoints", width, height), args.seed)
+    writeLevel(os.path.join("res/levels", args.filename), info)
+    if args.register != None:
+        registerLevel(args.register, args.filename, args.times)
+    print("saved res/levels/" + args.filename + " (" + str(width) + "x" + str(height) + ")")
+
+if __name__ == "__main__":
+    main()
@@ -147,16 +147,44 @@ class ImageManager:
     def getTileImage(self, tile):
         return self.getImage(tile.info["img_name"], tile.info["img_id"])
 
+#clock that reads the real time, in milliseconds since pygame was started
+class RealClock:
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+    #the real time moves by itself (see SteppedClock)
+    def advance(self, seconds):
+        pass
+
+#clock that only moves when it's told to, so the game can be run faster than real time and always does the same thing (see Game.update)
+class SteppedClock:
+    def __init__(self, ticks = 0):
+        self.ticks = ticks
+
+    def get_ticks(self):
+        return self.ticks
+
+    #moves the clock forward by the given seconds
+    def advance(self, seconds):
+        self.ticks += seconds * 1000
+
+#the clock used by the cooldowns and animations that aren't given one
+REAL_CLOCK = RealClock()
+
 #small helper class for handling cooldowns
+#clock is where the time is read from (see RealClock/SteppedClock)
 class Cooldowns:
-    def __init__(self):
+    def __init__(self, clock = None):
+        if clock == None:
+            clock = REAL_CLOCK
+        self.clock = clock
         self.cooldowns = {}
         self.last_used = ""
 
     #creates a cooldown under 'name' with the given length
     def create(self, name, length):
         self.last_used = name
-        self.cooldowns[name] = [length, -1]
+        self.cooldowns[name] = [length, None]
         return self
 
     #starts the cooldown, if no name is given the last name used in any of the functions will be used instead
@@ -166,7 +194,7 @@ class Cooldowns:
         else:
             self.last_used = name
         
-        self.cooldowns[name][1] = pygame.time.get_ticks()
+        self.cooldowns[name][1] = self.clock.get_ticks()
         return self
 
     #stops the cooldown, if no name is given the last name used in any of the functions will be used instead
@@ -176,7 +204,7 @@ class Cooldowns:
         else:
             self.last_used = name
         
-        self.cooldowns[name][1] = -1
+        self.cooldowns[name][1] = None
         return self
 
     #checks if the cooldown has finished, if no name is given the last name used in any of the functions will be used instead
@@ -187,7 +215,7 @@ class Cooldowns:
             self.last_used = name
             
         cd = self.cooldowns[name]
-        if cd[1] > 0 and pygame.time.get_ticks() - cd[1] >= cd[0]:
+        if cd[1] != None and self.clock.get_ticks() - cd[1] >= cd[0]:
             return True
         return False
 
@@ -198,7 +226,8 @@ class Cooldowns:
         else:
             self.last_used = name
 
-        self.cooldowns[name][1] += offset
+        if self.cooldowns[name][1] != None:
+            self.cooldowns[name][1] += offset
         return self
 
     #how long has elapsed since the cooldown was started, if no name is given the last name used in any of the functions will be used instead
@@ -208,7 +237,7 @@ class Cooldowns:
         else:
             self.last_used = name
 
-        return pygame.time.get_ticks() - self.cooldowns[name][1]
+        return self.clock.get_ticks() - self.cooldowns[name][1]
 
 #animation class
 class Animation:
@@ -216,19 +245,24 @@ class Animation:
     #images is an array of images
     #frametimes is an array of frametimes, these two arrays correspond to each other
     #loop is whether or not the animation should loop by default
-    def __init__(self, imagemanager, images, frametimes, loop = False):
+    #clock is where the time is read from (see RealClock/SteppedClock)
+    def __init__(self, imagemanager, images, frametimes, loop = False, clock = None):
+        if clock == None:
+            clock = REAL_CLOCK
         self.im = imagemanager
         self.images = images
         self.frametimes = frametimes
         self.frame = 0
-        self.last_tick = -1
+        self.last_tick = None
         self.loop = loop
+        self.clock = clock
 
     #gets the current frame
     def get(self):
-        if self.last_tick > 0:
+        if self.last_tick != None:
             stop = False
-            elapsed = pygame.time.get_ticks() - self.last_tick
+            now = self.clock.get_ticks()
+            elapsed = now - self.last_tick
             while elapsed > self.frametimes[self.frame]:
                 elapsed = elapsed - self.frametimes[self.frame]
                 self.frame = (self.frame + 1) % len(self.images)
@@ -237,25 +271,25 @@ class Animation:
                     stop = True
                     break
             if stop:
-                self.last_tick = -1
+                self.last_tick = None
             else:
-                self.last_tick = pygame.time.get_ticks() - elapsed
+                self.last_tick = now - elapsed
         return self.im.get(*self.images[self.frame])
 
     #starts the animation
     def start(self):
-        self.last_tick = pygame.time.get_ticks()
+        self.last_tick = self.clock.get_ticks()
         return self
 
     #pauses the animation
     def pause(self):
-        self.last_tick = -1
+        self.last_tick = None
         return self
 
     #restarts the animation
     def restart(self):
         self.frame = 0
-        self.last_tick = pygame.time.get_ticks()
+        self.last_tick = self.clock.get_ticks()
         return self
 
     #sets wether or not the animation should loop (otherwise it will just stop once its done)
@@ -268,9 +302,11 @@ class Animation:
 class AnimationSet:
     #imagemanager is the ImageManager the animations will find their images in
     #info is an array of strings detailing the animations
-    def __init__(self, imagemanager, info):
+    #clock is where the animations read the time from (see RealClock/SteppedClock)
+    def __init__(self, imagemanager, info, clock = None):
         self.im = imagemanager
         self.info = info
+        self.clock = clock
         self.animations = {}
         for line in info:
             split0 = line.split(":")
@@ -282,12 +318,20 @@ class AnimationSet:
                 frame = split1[i].split(",")
                 images.append([frame[0], int(frame[1])])
                 frametimes.append(int(frame[2]))
-            self.animations[name] = Animation(imagemanager, images, frametimes)
+            self.animations[name] = Animation(imagemanager, images, frametimes, False, clock)
         self.cur = None
 
-    #copys the animation set to a new one
-    def copy(self):
-        return AnimationSet(self.im, self.info)
+    #copys the animation set to a new one, the frames are shared instead of parsing info again
+    #the copy reads the time from clock if one is given, otherwise the same clock as this set
+    def copy(self, clock = None):
+        if clock == None:
+            clock = self.clock
+        aniset = AnimationSet(self.im, [], clock)
+        aniset.info = self.info
+        for name in self.animations:
+            animation = self.animations[name]
+            aniset.animations[name] = Animation(self.im, animation.images, animation.frametimes, False, clock)
+        return aniset
 
     #plays an animationo once
     def play(self, name = None):
@@ -1,4 +1,42 @@
-import math
+import math, bisect, time
+
+INFINITY = float("inf")
+
+#packs the chunk coordinates cx, cy in to a single integer for keying World.chunks
+#cy is kept to 32 bits, that's far more chunks than any level will have
+def chunkKey(cx, cy):
+    return (cx << 32) | (cy & 0xFFFFFFFF)
+
+#gets the range of cells (cx0, cy0, cx1, cy1 inclusive) of size cwidth, cheight covering the area x, y, width, height
+def spanOf(x, y, width, height, cwidth, cheight):
+    cx0, cy0 = math.floor(x/cwidth), math.floor(y/cheight)
+    cx1, cy1 = math.floor((x+width)/cwidth), math.floor((y+height)/cheight)
+    return min(cx0, cx1), min(cy0, cy1), max(cx0, cx1), max(cy0, cy1)
+
+#block types are registered as bits so queries can filter them with masks instead of comparing strings (see World.queryArea)
+TYPE_BITS = {}
+#mask containing every block type
+ALL_TYPES = -1
+
+#gets the bit for the block type 'name', registering it if it's new
+def typeBit(name):
+    bit = TYPE_BITS.get(name)
+    if bit == None:
+        bit = 1 << len(TYPE_BITS)
+        TYPE_BITS[name] = bit
+    return bit
+
+#gets the mask for a list of block type names, if names is None 'default' is returned.
+#masks are passed straight through so either can be used.
+def typeMask(names, default = ALL_TYPES):
+    if names == None:
+        return default
+    if isinstance(names, int):
+        return names
+    mask = 0
+    for name in names:
+        mask |= typeBit(name)
+    return mask
 
 #container for collision objects
 #
@@ -6,62 +44,220 @@ import math
 #blocks will be placed in the chunks they intersect, when checking
 #for collisions they will only be checked against blocks in the same chunks
 #as them.
+#
+#In hierarchical mode there are several levels of chunks, each twice the size of the one below it.
+#blocks go in the finest level whose chunks are at least as large as they are, and queries walk the levels
+#from coarse to fine. So a few huge blocks don't force large chunks on everything else.
 class World:
     #chunkwidth and chunkheight determine how large the chunk size is
-    #these should be larger than your largest object.
-    def __init__(self, chunkwidth, chunkheight):
+    #these should be larger than your largest object (unless hierarchical is true, then they are the size of the finest level).
+    #if sweep_and_prune is true, dynamic blocks (see Block.dynamic) are kept in a SweepAndPrune broadphase instead of the chunks
+    def __init__(self, chunkwidth, chunkheight, sweep_and_prune = False, hierarchical = False):
+        #chunks are keyed by their packed chunk coordinates (see chunkKey)
         self.chunks = {}
+        #the chunks for each level, coarser levels are only added when a block needs them
+        self.levels = [self.chunks]
+        self.hierarchical = hierarchical
         self.cid = 0
         self.chunk_width = chunkwidth
         self.chunk_height = chunkheight
         self.blocks = {}
+        #every block in self.blocks, for quick membership checks
+        self.block_set = set()
         self.max_priority = 0
+        #optional collision layer for tile blocks (see TileGrid)
+        self.tile_grid = None
+        self.sap = None
+        if sweep_and_prune:
+            self.sap = SweepAndPrune()
+        #static blocks are moved in to this once the world is built (see buildStatic)
+        self.bvh = None
+        #list of the areas queried while recording (see startTrace), None when not recording
+        self.query_trace = None
+        #how many queries (see queryArea and shapeCast) have been made in the world
+        self.query_count = 0
 
     #adds a block to the world
     def addBlock(self, block):
+        if block in self.block_set:
+            return
         pri = block.get_priority()
         if not pri in self.blocks.keys():
             self.blocks[pri] = []
             if pri > self.max_priority:
                 self.max_priority = pri
-        if not block in self.blocks[pri]:
-            self.blocks[pri].append(block)
+        self.blocks[pri].append(block)
+        self.block_set.add(block)
 
     #removes a block from the world
     def removeBlock(self, block):
-        pri = block.get_priority()
-        if pri in self.blocks.keys():
-            if block in self.blocks[pri]:
-                self.blocks[pri].remove(block)
+        if block in self.block_set:
+            self.blocks[block.get_priority()].remove(block)
+            self.block_set.remove(block)
 
     #resets the world, clearing all blocks
+    #blocks that are kept past the reset (like skulls in pylevel) forget their chunks so they join the new ones when updateChunks is called
     def reset(self):
         self.cid = 0
-        for chunklist in self.chunks.values():
-            for chunk in chunklist.values():
-                del chunk
-        del self.chunks
-        del self.blocks
+        for block in self.block_set:
+            block.chunks = []
+            block.chunk_span = None
+            block.bvh_index = None
         self.chunks = {}
+        self.levels = [self.chunks]
         self.blocks = {}
+        self.block_set = set()
+        self.tile_grid = None
+        self.bvh = None
+        if self.sap != None:
+            self.sap.clear()
+
+    #starts recording the areas of every query (see queryArea and shapeCast) in to query_trace
+    def startTrace(self):
+        self.query_trace = []
+
+    #stops recording queries and returns the areas recorded
+    def stopTrace(self):
+        trace = self.query_trace
+        self.query_trace = None
+        return trace
+
+    #changes the chunk size, moving every block in the chunks in to new chunks of the new size
+    def setChunkSize(self, chunkwidth, chunkheight):
+        blocks = [block for block in self.block_set if block.chunk_span != None]
+        for block in blocks:
+            block.chunks = []
+            block.chunk_span = None
+        self.chunk_width = chunkwidth
+        self.chunk_height = chunkheight
+        self.chunks = {}
+        self.levels = [self.chunks]
+        for block in blocks:
+            block.updateChunks()
+
+    #chunk sizes tried by tuneChunkSize, they aren't multiples of the usual tile sizes so rows of tiles don't all end on chunk edges (and in two chunks)
+    TUNE_SIZES = [40, 50, 70, 100, 140, 200, 280, 400, 560]
+    #how many blocks looking at a chunk costs as much as, used by tuneChunkSize's estimate
+    CHUNK_COST = 2
+
+    #picks the chunk size that makes queries cheapest for the blocks in the chunks and switches to it (see setChunkSize).
+    #       queries is the list of query areas [x, y, width, height] to tune for, like a recorded trace (see startTrace),
+    #       if it is None the areas of the blocks themselves are used (blocks mostly look for what's around them)
+    #       sizes is the list of chunk sizes to try (square chunks), TUNE_SIZES if it is None
+    #       timed determines if each size is measured by really running the queries rather than estimated
+    #       by counting the blocks and chunks they would look at (slower but takes everything in to account)
+    #returns [chunk_width, chunk_height, costs] where costs has the estimated cost (or time in seconds) per query for each size
+    def tuneChunkSize(self, queries = None, sizes = None, timed = False):
+        blocks = [block for block in self.block_set if block.chunk_span != None]
+        if queries == None:
+            queries = [[block.x, block.y, block.width, block.height] for block in blocks]
+        if sizes == None:
+            sizes = World.TUNE_SIZES
+        if len(blocks) == 0 or len(queries) == 0:
+            return [self.chunk_width, self.chunk_height, {}]
+        costs = {}
+        for size in sizes:
+            if timed:
+                self.setChunkSize(size, size)
+                start = time.perf_counter()
+                for query in queries:
+                    self.queryArea(query[0], query[1], query[2], query[3], None, True, ALL_TYPES, True, True)
+                costs[size] = (time.perf_counter() - start) / len(queries)
+            else:
+                costs[size] = self.estimateCost(blocks, queries, size)
+        best = min(sizes, key = lambda size: costs[size])
+        self.setChunkSize(best, best)
+        return [best, best, costs]
+
+    #estimates the cost per query of the queries on blocks with square chunks of the given size (see tuneChunkSize)
+    def estimateCost(self, blocks, queries, size):
+        counts = {}
+        for block in blocks:
+            cx0, cy0, cx1, cy1 = spanOf(block.x, block.y, block.width, block.height, size, size)
+            for cx in range(cx0, cx1+1):
+                for cy in range(cy0, cy1+1):
+                    key = chunkKey(cx, cy)
+                    counts[key] = counts.get(key, 0) + 1
+        cost = 0
+        for query in queries:
+            cx0, cy0, cx1, cy1 = spanOf(query[0], query[1], query[2], query[3], size, size)
+            for cx in range(cx0, cx1+1):
+                for cy in range(cy0, cy1+1):
+                    count = counts.get(chunkKey(cx, cy))
+                    if count != None:
+                        cost += count + World.CHUNK_COST
+        return cost / len(queries)
+
+    #moves every block that isn't dynamic (see Block.dynamic) out of the chunks in to a StaticBVH built in one go.
+    #should be called once the world has been built, blocks added after this go in to the chunks as normal.
+    def buildStatic(self):
+        static = []
+        if self.bvh != None:
+            static = [block for block in self.bvh.items if block != None]
+        for block in self.block_set:
+            if not block.dynamic and block.chunk_span != None:
+                for chunk in block.chunks:
+                    chunk.remove(block)
+                block.chunks = []
+                block.chunk_span = None
+                static.append(block)
+        self.bvh = StaticBVH(static)
+
+    #creates a chunk (x, y represent chunk coordinates, not real coordinates, level is the level it's in)
+    def createChunk(self, x, y, level = 0):
+        chunk = Chunk(self, x, y, level)
+        self.levels[level][chunkKey(x, y)] = chunk
+        return chunk
 
-    #creates a chunk (x, y represent chunk coordinates, not real coordinates)
-    def createChunk(self, x, y):
-        if not x in self.chunks.keys():
-            self.chunks[x] = {}
-        chunk = Chunk(self, x, y)
-        self.chunks[x][y] = chunk
+    #gets a chunk (x, y represent chunk coordinates), creating it if it doesn't exist.
+    #only used for adding blocks, queries use chunksInArea so they never create chunks
+    def getChunk(self, x, y, level = 0):
+        chunk = self.levels[level].get(chunkKey(x, y))
+        if chunk == None:
+            return self.createChunk(x, y, level)
         return chunk
 
-    #gets a chunk (x, y represent chunk coordinates)
-    def getChunk(self, x, y):
-        if x in self.chunks.keys():
-            if y in self.chunks[x].keys():
-                return self.chunks[x][y]
-            else:
-                return self.createChunk(x, y)
-        else:
-            return self.createChunk(x, y)
+    #removes an empty chunk from the world (see Chunk.remove), coarse levels left without any chunks are dropped
+    def removeChunk(self, chunk):
+        chunks = self.levels[chunk.level]
+        key = chunkKey(chunk.x, chunk.y)
+        if chunks.get(key) is chunk:
+            del chunks[key]
+            while len(self.levels) > 1 and len(self.levels[-1]) == 0:
+                self.levels.pop()
+
+    #gets the level a block of size width, height goes in, always 0 if the world isn't hierarchical
+    def levelFor(self, width, height):
+        level = 0
+        if self.hierarchical:
+            size = max(width / self.chunk_width, height / self.chunk_height)
+            while size > 1:
+                size /= 2
+                level += 1
+            while len(self.levels) <= level:
+                self.levels.append({})
+        return level
+
+    #gets the range of chunks (cx0, cy0, cx1, cy1 inclusive) in the given level covering the area x, y, width, height
+    def chunkSpan(self, x, y, width, height, level = 0):
+        return spanOf(x, y, width, height, self.chunk_width * (1 << level), self.chunk_height * (1 << level))
+
+    #gets the chunks that already exist in the area x, y, width, height (doesn't create any)
+    #in hierarchical mode the levels are searched from coarse to fine, skipping empty ones.
+    #chunks are removed once they're empty, so a level without chunks has no blocks in it
+    def chunksInArea(self, x, y, width, height):
+        chunks = []
+        for level in range(len(self.levels)-1, -1, -1):
+            if len(self.levels[level]) == 0:
+                continue
+            get = self.levels[level].get
+            cx0, cy0, cx1, cy1 = self.chunkSpan(x, y, width, height, level)
+            for cx in range(cx0, cx1+1):
+                for cy in range(cy0, cy1+1):
+                    chunk = get(chunkKey(cx, cy))
+                    if chunk != None:
+                        chunks.append(chunk)
+        return chunks
 
     #creates a block, generally unused as block is mainly designed to be overriden.
     def createBlock(self, x, y, width, height):
@@ -74,10 +270,10 @@ class World:
         self.cid+=1
         return self.cid
 
-    #uses "checkAndReturnArea" and checks if any blocks fulfilling the criteria were found, true is they were found.
+    #uses "queryArea" and checks if any blocks fulfilling the criteria were found, true is they were found.
     #the only difference in parametres is find_all is always set to false, so it will just stop after the first block is found
-    def checkArea(self, x, y, width, height, ignorelist = [], strict = True, typelist = None, ignoresolid = False, ignoretype = []):
-        return len(self.checkAndReturnArea(x, y, width, height, ignorelist, strict, typelist, ignoresolid, False, ignoretype)) > 0
+    def checkArea(self, x, y, width, height, ignorelist = None, strict = True, typelist = None, ignoresolid = False, ignoretype = None):
+        return len(self.queryArea(x, y, width, height, ignorelist, strict, typeMask(typelist), ignoresolid, False, typeMask(ignoretype, 0))) > 0
 
     #checks the given area for blocks of the given criteria.
     #       x, y, width, height details the area to search in
@@ -87,57 +283,475 @@ class World:
     #       ignoresolid determines if the collision detection should ignore whether or not blocks are solid or now
     #       find_all determines if it should find all blocks that fulfill the criteria within the area or just stop after the first one
     #       ignoretype is a blacklist for block types (types in ignoretype won't be checked)
-    def checkAndReturnArea(self, x, y, width, height, ignorelist = [], strict = True, typelist = None, ignoresolid = False, find_all = False, ignoretype = []):
-        temp_block = Block(self, x, y, width, height, -1)
-        temp_block.updateChunks()
-        ignorelist.append(temp_block)
+    #kept for compatibility, see queryArea.
+    def checkAndReturnArea(self, x, y, width, height, ignorelist = None, strict = True, typelist = None, ignoresolid = False, find_all = False, ignoretype = None):
+        return self.queryArea(x, y, width, height, ignorelist, strict, typeMask(typelist), ignoresolid, find_all, typeMask(ignoretype, 0))
+
+    #the area query engine, takes the same parametres as checkAndReturnArea except the type lists are
+    #replaced by masks of type bits (see typeBit):
+    #       include is the mask of block types to look for (ALL_TYPES looks for every type)
+    #       exclude is the mask of block types to skip
+    #chunks keep their blocks in buckets by type, so whole buckets are skipped without looking at the blocks in them.
+    #doesn't create any blocks or chunks and never changes the lists it is given, only the chunks that already exist
+    #in the area are looked at. Blocks spanning several chunks are only returned once.
+    #ignorelist can also be a single block (or None to ignore nothing).
+    def queryArea(self, x, y, width, height, ignorelist = None, strict = True, include = -1, ignoresolid = False, find_all = False, exclude = 0):
+        self.query_count += 1
+        if self.query_trace != None:
+            self.query_trace.append([x, y, width, height])
+        if isinstance(ignorelist, Block):
+            ignorelist = (ignorelist,)
+        chunks = self.chunksInArea(x, y, width, height)
+        #a block can only turn up twice if more than one chunk is searched
+        seen = None
+        if len(chunks) > 1:
+            seen = set()
+
         result = []
-        for chunk in temp_block.chunks:
-            for block in chunk.blocks.values():
-                if typelist == None or block.get_type() in typelist:
-                    if not block in ignorelist and not block.get_type() in ignoretype:
-                        if temp_block.collide_check(block, strict, ignoresolid):
-                            result.append(block)
-                            if not find_all:
-                                break
-                #elif typelist != None:
-                #    print(str(block.get_type()))
-            if len(result) > 0 and not find_all:
-                break
-        temp_block.destroy()
+        for chunk in chunks:
+            if not chunk.mask & include or not chunk.mask & ~exclude:
+                continue
+            for bit, bucket in chunk.buckets.items():
+                if not bit & include or bit & exclude:
+                    continue
+                for block in bucket.values():
+                    if seen != None:
+                        if block.blockid in seen:
+                            continue
+                        seen.add(block.blockid)
+                    if (ignoresolid or block.solid) and not (ignorelist and block in ignorelist) and block.overlapsArea(x, y, width, height, strict):
+                        result.append(block)
+                        if not find_all:
+                            return result
+        if self.sap != None:
+            for block in self.sap.candidates(x, width):
+                if self.matchBlock(block, x, y, width, height, ignorelist, strict, include, ignoresolid, exclude):
+                    result.append(block)
+                    if not find_all:
+                        return result
+        if self.bvh != None and self.bvh.query(x, y, width, height, result, ignorelist, strict, include, ignoresolid, find_all, exclude):
+            return result
+        if self.tile_grid != None:
+            self.tile_grid.query(x, y, width, height, result, ignorelist, strict, include, ignoresolid, find_all, exclude)
         return result
 
+    #checks if block fulfills the criteria of a query (see queryArea)
+    def matchBlock(self, block, x, y, width, height, ignorelist, strict, include, ignoresolid, exclude):
+        if not ignoresolid and not block.solid:
+            return False
+        if not block.type_bit & include or block.type_bit & exclude:
+            return False
+        if ignorelist and block in ignorelist:
+            return False
+        return block.overlapsArea(x, y, width, height, strict)
+
+    #sweeps the box [x, y, width, height] by dx, dy and finds the first block it would hit along the way.
+    #one test over the chunks (and tile grid cells) the path covers, so the cost doesn't depend on how fast things move.
+    #       ignorelist, strict, include, ignoresolid and exclude are the filters, they mean the same as in queryArea
+    #returns [time, [normal_x, normal_y], block] where time is the fraction of dx, dy travelled before hitting block and
+    #normal is the side of block that was hit, or None if nothing is hit.
+    #blocks already overlapping the box are hit at time 0 (like the old move, which stopped anything left overlapping a block),
+    #circles are treated as their bounding box.
+    def shapeCast(self, box, dx, dy, ignorelist = None, strict = True, include = -1, ignoresolid = False, exclude = 0):
+        if dx == 0 and dy == 0:
+            return None
+        if isinstance(ignorelist, Block):
+            ignorelist = (ignorelist,)
+        x, y, width, height = box
+        sx, sy = min(x, x + dx), min(y, y + dy)
+        swidth, sheight = width + math.fabs(dx), height + math.fabs(dy)
+        self.query_count += 1
+        if self.query_trace != None:
+            self.query_trace.append([sx, sy, swidth, sheight])
+
+        candidates = []
+        for chunk in self.chunksInArea(sx, sy, swidth, sheight):
+            if chunk.mask & include and chunk.mask & ~exclude:
+                for bit, bucket in chunk.buckets.items():
+                    if bit & include and not bit & exclude:
+                        candidates.extend(bucket.values())
+        if self.sap != None:
+            for block in self.sap.candidates(sx, swidth):
+                if block.type_bit & include and not block.type_bit & exclude:
+                    candidates.append(block)
+        if self.bvh != None:
+            candidates.extend(self.bvh.candidates(sx, sy, swidth, sheight, include, exclude))
+
+        best = None
+        for block in candidates:
+            if not ignoresolid and not block.solid:
+                continue
+            if ignorelist and block in ignorelist:
+                continue
+            hit = sweepBox(x, y, width, height, dx, dy, block.x, block.y, block.width, block.height, strict)
+            if hit != None and (best == None or hit[0] < best[0]):
+                best = [hit[0], hit[1], block]
+
+        grid = self.tile_grid
+        if grid != None:
+            tx0, ty0, tx1, ty1 = grid.cellRange(sx, sy, swidth, sheight, strict)
+            for ty in range(ty0, ty1+1):
+                row = ty * grid.width
+                for tx in range(tx0, tx1+1):
+                    if grid.match(row + tx, ignorelist, include, ignoresolid, exclude):
+                        hit = sweepBox(x, y, width, height, dx, dy, tx * grid.tile_width, ty * grid.tile_height, grid.tile_width, grid.tile_height, strict)
+                        if hit != None and (best == None or hit[0] < best[0]):
+                            best = [hit[0], hit[1], grid.blocks[row + tx]]
+
+        if best == None:
+            return None
+        if best[1] == 0:
+            normal = [-math.copysign(1, dx), 0]
+        else:
+            normal = [0, -math.copysign(1, dy)]
+        return [best[0], normal, best[2]]
+
+#tile-aligned collision layer for blocks that never move and fill exactly one tile (walls, turrets)
+#
+#instead of being put in to chunks these blocks are stored in flat arrays indexed by their tile coordinates,
+#so checking an area against them only means looking up the few cells the area covers.
+#the arrays hold the block in each cell, whether the cell is solid and the cells block type bit (see typeBit).
+class TileGrid:
+    #width, height are the grid dimensions in tiles
+    #tile_width, tile_height are the dimensions of a single tile
+    def __init__(self, width, height, tile_width, tile_height):
+        self.width = width
+        self.height = height
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.blocks = [None] * (width * height)
+        self.solid = bytearray(width * height)
+        #0 for empty cells
+        self.types = [0] * (width * height)
+
+    #adds block to the cell tx, ty (replacing anything that was there)
+    def add(self, block, tx, ty):
+        if tx >= 0 and ty >= 0 and tx < self.width and ty < self.height:
+            i = tx + (ty * self.width)
+            self.blocks[i] = block
+            self.solid[i] = block.solid
+            self.types[i] = block.type_bit
+            return True
+        return False
+
+    #empties the cell tx, ty
+    def remove(self, tx, ty):
+        i = tx + (ty * self.width)
+        self.blocks[i] = None
+        self.solid[i] = 0
+        self.types[i] = 0
+
+    #changes whether the cell tx, ty is solid (see Tile.setSolid in pylevel)
+    def setSolid(self, tx, ty, solid):
+        self.solid[tx + (ty * self.width)] = solid
+
+    #gets the range of cells (tx0, ty0, tx1, ty1 inclusive) covered by the area, clipped to the grid.
+    #strict means the same as in Block.colliding(), if it's false cells just touching the area are included
+    def cellRange(self, x, y, width, height, strict = True):
+        if strict:
+            tx0, ty0 = math.floor(x/self.tile_width), math.floor(y/self.tile_height)
+            tx1, ty1 = math.ceil((x+width)/self.tile_width) - 1, math.ceil((y+height)/self.tile_height) - 1
+        else:
+            tx0, ty0 = math.ceil(x/self.tile_width) - 1, math.ceil(y/self.tile_height) - 1
+            tx1, ty1 = math.floor((x+width)/self.tile_width), math.floor((y+height)/self.tile_height)
+        return max(0, tx0), max(0, ty0), min(self.width-1, tx1), min(self.height-1, ty1)
+
+    #checks if the cell i matches the criteria (see World.queryArea for what they mean)
+    def match(self, i, ignorelist, include, ignoresolid, exclude):
+        t = self.types[i]
+        if not t & include or t & exclude or (not ignoresolid and not self.solid[i]):
+            return False
+        if ignorelist and self.blocks[i] in ignorelist:
+            return False
+        return True
+
+    #adds the blocks in the area fulfilling the criteria to result (see World.queryArea)
+    def query(self, x, y, width, height, result, ignorelist = None, strict = True, include = -1, ignoresolid = False, find_all = False, exclude = 0):
+        tx0, ty0, tx1, ty1 = self.cellRange(x, y, width, height, strict)
+        for ty in range(ty0, ty1+1):
+            row = ty * self.width
+            for tx in range(tx0, tx1+1):
+                if self.match(row + tx, ignorelist, include, ignoresolid, exclude):
+                    result.append(self.blocks[row + tx])
+                    if not find_all:
+                        return result
+        return result
+
+    #gets the range of cells (tx0, ty0, tx1, ty1) which hold blocks colliding with the area, None if there are none.
+    #used by Block.move to work out where to move back to.
+    def hitRange(self, x, y, width, height, strict = True, ignoresolid = False, exclude = 0):
+        hit = None
+        tx0, ty0, tx1, ty1 = self.cellRange(x, y, width, height, strict)
+        for ty in range(ty0, ty1+1):
+            row = ty * self.width
+            for tx in range(tx0, tx1+1):
+                if self.match(row + tx, None, -1, ignoresolid, exclude):
+                    if hit == None:
+                        hit = [tx, ty, tx, ty]
+                    else:
+                        hit = [min(hit[0], tx), min(hit[1], ty), max(hit[2], tx), max(hit[3], ty)]
+        return hit
+
+#bounding volume hierarchy for static blocks (blocks which never move, see World.buildStatic)
+#
+#built in one go by sorting the blocks along the longest axis and splitting them in half until there are only a
+#few left in each leaf. Large empty areas cost nothing, a query only goes down the branches whose boxes it overlaps.
+#nodes are stored in flat lists in depth-first order, so the left child of a node is always the next node and
+#first is the right child for branches or the first item for leaves (count is 0 for branches).
+#each node also has the mask of the block types below it (see typeBit), so queries can skip whole branches by type.
+class StaticBVH:
+    #leaves hold at most this many blocks
+    LEAF_SIZE = 8
+
+    #blocks is the list of blocks to build it from
+    def __init__(self, blocks):
+        self.items = list(blocks)
+        self.min_x, self.min_y, self.max_x, self.max_y = [], [], [], []
+        self.masks = []
+        self.first = []
+        self.count = []
+        if len(self.items) > 0:
+            self.build(0, len(self.items))
+        #the blocks don't move so their boxes are kept here too for the queries, exact marks the blocks that
+        #need their own overlapsArea (circles)
+        self.boxes = []
+        self.exact = []
+        for i in range(len(self.items)):
+            block = self.items[i]
+            block.bvh_index = i
+            self.boxes.append((block.x, block.y, block.x + block.width, block.y + block.height))
+            self.exact.append(type(block).overlapsArea is not Block.overlapsArea)
+
+    #builds the node for the items start to end (not inclusive), returns the index of the node
+    def build(self, start, end):
+        items = self.items
+        node = len(self.first)
+        min_x, min_y = INFINITY, INFINITY
+        max_x, max_y = -INFINITY, -INFINITY
+        mask = 0
+        for i in range(start, end):
+            block = items[i]
+            min_x, min_y = min(min_x, block.x), min(min_y, block.y)
+            max_x, max_y = max(max_x, block.x + block.width), max(max_y, block.y + block.height)
+            mask |= block.type_bit
+        self.min_x.append(min_x)
+        self.min_y.append(min_y)
+        self.max_x.append(max_x)
+        self.max_y.append(max_y)
+        self.masks.append(mask)
+        self.first.append(start)
+        self.count.append(end - start)
+        if end - start > StaticBVH.LEAF_SIZE:
+            #split the blocks in half by their centres along the longer side
+            if max_x - min_x >= max_y - min_y:
+                items[start:end] = sorted(items[start:end], key = lambda block: block.x + block.width / 2)
+            else:
+                items[start:end] = sorted(items[start:end], key = lambda block: block.y + block.height / 2)
+            middle = (start + end) // 2
+            self.count[node] = 0
+            self.build(start, middle)
+            self.first[node] = self.build(middle, end)
+        return node
+
+    #takes a block out (the tree isn't rebuilt, its slot is just emptied)
+    def remove(self, block):
+        self.items[block.bvh_index] = None
+        block.bvh_index = None
+
+    #adds the blocks in the area fulfilling the criteria to result (see World.queryArea), returns True if it stopped after finding one
+    def query(self, x, y, width, height, result, ignorelist = None, strict = True, include = -1, ignoresolid = False, find_all = False, exclude = 0):
+        if len(self.first) == 0:
+            return False
+        x1, y1 = x + width, y + height
+        items, boxes, exact, masks, first, count = self.items, self.boxes, self.exact, self.masks, self.first, self.count
+        min_x, min_y, max_x, max_y = self.min_x, self.min_y, self.max_x, self.max_y
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if max_x[node] < x or min_x[node] > x1 or max_y[node] < y or min_y[node] > y1:
+                continue
+            mask = masks[node]
+            if not mask & include or not mask & ~exclude:
+                continue
+            if count[node] == 0:
+                stack.append(first[node])
+                stack.append(node + 1)
+                continue
+            for i in range(first[node], first[node] + count[node]):
+                block = items[i]
+                if block == None or not block.type_bit & include or block.type_bit & exclude:
+                    continue
+                if not ignoresolid and not block.solid:
+                    continue
+                bx0, by0, bx1, by1 = boxes[i]
+                if strict:
+                    if bx1 <= x or bx0 >= x1 or by1 <= y or by0 >= y1:
+                        continue
+                elif bx1 < x or bx0 > x1 or by1 < y or by0 > y1:
+                    continue
+                if exact[i] and not block.overlapsArea(x, y, width, height, strict):
+                    continue
+                if ignorelist and block in ignorelist:
+                    continue
+                result.append(block)
+                if not find_all:
+                    return True
+        return False
+
+    #gets the blocks in leaves overlapping (or touching) the area x, y, width, height whose type is in include and not in exclude
+    #these still need checking against the area itself (see World.queryArea)
+    def candidates(self, x, y, width, height, include = -1, exclude = 0):
+        result = []
+        if len(self.first) == 0:
+            return result
+        x1, y1 = x + width, y + height
+        items, masks, first, count = self.items, self.masks, self.first, self.count
+        min_x, min_y, max_x, max_y = self.min_x, self.min_y, self.max_x, self.max_y
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if max_x[node] < x or min_x[node] > x1 or max_y[node] < y or min_y[node] > y1:
+                continue
+            mask = masks[node]
+            if not mask & include or not mask & ~exclude:
+                continue
+            if count[node] == 0:
+                stack.append(first[node])
+                stack.append(node + 1)
+            else:
+                for i in range(first[node], first[node] + count[node]):
+                    block = items[i]
+                    if block != None and block.type_bit & include and not block.type_bit & exclude:
+                        result.append(block)
+        return result
+
+#sweep-and-prune broadphase for dynamic blocks (blocks which move every frame, see Block.dynamic)
+#
+#keeps the blocks in a list sorted by their x coordinate. Blocks only move a little each frame so
+#keeping it sorted is just an insertion-sort step or two per move, rather than re-registering them in chunks.
+#the blocks overlapping a range along x can then be found with a binary search.
+#
+#blocks remember the x they're sorted under (Block.sap_key) rather than their place in the list, so they're found with a binary search
+#and nothing has to be renumbered when blocks come and go, which keeps bullets coming and going cheap however many blocks there are.
+class SweepAndPrune:
+    def __init__(self):
+        self.bodies = []
+        self.keys = []
+        self.max_width = 0
+
+    #removes all blocks
+    def clear(self):
+        for block in self.bodies:
+            block.sap_key = None
+        self.bodies = []
+        self.keys = []
+        self.max_width = 0
+
+    #adds a block, keeping the lists sorted
+    def add(self, block):
+        i = bisect.bisect_right(self.keys, block.x)
+        self.keys.insert(i, block.x)
+        self.bodies.insert(i, block)
+        block.sap_key = block.x
+        if block.width > self.max_width:
+            self.max_width = block.width
+
+    #gets the place of a block in the lists
+    def find(self, block):
+        i = bisect.bisect_left(self.keys, block.sap_key)
+        bodies = self.bodies
+        while bodies[i] is not block:
+            i += 1
+        return i
+
+    #removes a block
+    def remove(self, block):
+        i = self.find(block)
+        del self.keys[i]
+        del self.bodies[i]
+        block.sap_key = None
+        if len(self.bodies) == 0:
+            self.max_width = 0
+
+    #moves the block to its new place in the lists after it has moved
+    def update(self, block):
+        keys, bodies = self.keys, self.bodies
+        i = self.find(block)
+        x = block.x
+        keys[i] = x
+        while i > 0 and keys[i-1] > x:
+            keys[i], keys[i-1] = keys[i-1], x
+            bodies[i], bodies[i-1] = bodies[i-1], block
+            i -= 1
+        last = len(keys) - 1
+        while i < last and keys[i+1] < x:
+            keys[i], keys[i+1] = keys[i+1], x
+            bodies[i], bodies[i+1] = bodies[i+1], block
+            i += 1
+        block.sap_key = x
+        if block.width > self.max_width:
+            self.max_width = block.width
+
+    #gets the blocks that could overlap the range x to x + width (they still need checking along y)
+    def candidates(self, x, width):
+        lo = bisect.bisect_left(self.keys, x - self.max_width)
+        hi = bisect.bisect_right(self.keys, x + width)
+        return self.bodies[lo:hi]
+
 #contains blocks, explanation of what chunks do can be found above the World class
+#the blocks are kept in buckets by their type bit (see typeBit), mask has the bits of all the types in the chunk.
 class Chunk:
     #world is the world it belongs to
     #x, y are its chunk coordinates (not real coordinates)
-    def __init__(self, world, x, y):
+    #level is the level of the world it's in (see World)
+    def __init__(self, world, x, y, level = 0):
         self.world = world
         self.x = x
         self.y = y
-        self.blocks = {}
+        self.level = level
+        self.buckets = {}
+        self.mask = 0
 
-    #remove a block from the chunk
+    #remove a block from the chunk, chunks that end up empty are removed from the world
     def remove(self, block):
-        if block.blockid in self.blocks.keys():
-            del self.blocks[block.blockid]
+        bucket = self.buckets.get(block.type_bit)
+        if bucket != None and block.blockid in bucket:
+            del bucket[block.blockid]
+            if len(bucket) == 0:
+                del self.buckets[block.type_bit]
+                self.mask &= ~block.type_bit
+                if self.mask == 0:
+                    self.world.removeChunk(self)
 
     #add a block to the chunk
     def add(self, block):
-        self.blocks[block.blockid] = block
-        if not block in self.world.blocks:
-            self.world.addBlock(block)
+        bucket = self.buckets.get(block.type_bit)
+        if bucket == None:
+            bucket = {}
+            self.buckets[block.type_bit] = bucket
+            self.mask |= block.type_bit
+        bucket[block.blockid] = block
+
+    #returns all the blocks in the chunk
+    def getBlocks(self):
+        blocks = []
+        for bucket in self.buckets.values():
+            blocks.extend(bucket.values())
+        return blocks
 
 #the block class is the base collision-object class
 #is not really intended for direct use but rather to be overidden.
+#blocks use __slots__ to keep them small (levels make a lot of them), so subclasses need to list the attributes they add in their own __slots__.
 class Block:
+    __slots__ = ("world", "x", "y", "width", "height", "blockid", "solid", "collision_priority", "chunks", "chunk_span", "sap_key", "bvh_index", "type_bit")
+
     #world is the world the block belongs to
     #x, y, width, height are the dimensions of the blocks hitbox
     #blockid is the id of the block within the world (see world.nextID())
     def __init__(self, world, x, y, width, height, blockid):
         self.world = world
-        self.raw_x = x
-        self.raw_y = y
+        self.x = x
+        self.y = y
         self.width = width
         self.height = height
         self.blockid = blockid
@@ -145,22 +759,17 @@ class Block:
         self.collision_priority = False                   
 
         self.chunks = []
-
-    @property
-    def x(self):
-        return self.raw_x
-
-    @property
-    def y(self):
-        return self.raw_y
-
-    @x.setter
-    def x(self, new_x):
-        self.raw_x = new_x
-
-    @y.setter
-    def y(self, new_y):
-        self.raw_y = new_y
+        #the level and range of chunks the block is in (see World.chunkSpan), None if it isn't in any
+        self.chunk_span = None
+        #the x the block is sorted under in the worlds SweepAndPrune, None if it's not in it
+        self.sap_key = None
+        #position in the worlds StaticBVH, None if it's not in it
+        self.bvh_index = None
+        #the bit for the blocks type, used to filter queries (see typeBit)
+        self.type_bit = typeBit(self.get_type())
+
+    #dynamic blocks move every frame, if the world has a SweepAndPrune they are kept there instead of in the chunks
+    dynamic = False
 
     #the priority of the block, determines the order in which things are drawn/updated
     #lower values will be drawn and updated first (so will be underneath higher values)
@@ -171,19 +780,41 @@ class Block:
     def get_type(self):
         return "block"
 
-    #returns the blocks that share chunks with this block
-    def get_blocks(self):
+    #returns the blocks that share chunks with this block (and the dynamic blocks that could be touching it)
+    #dx, dy extend the area looked at to cover a move by dx, dy
+    def get_blocks(self, dx = 0, dy = 0):
+        x, y = min(self.x, self.x + dx), min(self.y, self.y + dy)
+        width, height = self.width + math.fabs(dx), self.height + math.fabs(dy)
+        chunks = self.chunks
+        #the blocks own chunks only hold blocks from its level in hierarchical mode
+        if dx != 0 or dy != 0 or self.sap_key != None or len(self.world.levels) > 1:
+            chunks = self.world.chunksInArea(x, y, width, height)
         col_blocks = []
-        for chunk in self.chunks:
-            col_blocks = list(chunk.blocks.values()) + col_blocks
-        while self in col_blocks:
-            col_blocks.remove(self)
+        for chunk in chunks:
+            for bucket in chunk.buckets.values():
+                for block in bucket.values():
+                    if block is not self:
+                        col_blocks.append(block)
+        if self.world.sap != None:
+            for block in self.world.sap.candidates(x, width):
+                if block is not self:
+                    col_blocks.append(block)
+        if self.world.bvh != None:
+            for block in self.world.bvh.candidates(x, y, width, height):
+                if block is not self:
+                    col_blocks.append(block)
         return col_blocks
 
     #destroys the block, removing it from all its chunks and the world
     def destroy(self):
         for chunk in self.chunks:
             chunk.remove(self)
+        self.chunks = []
+        self.chunk_span = None
+        if self.sap_key != None:
+            self.world.sap.remove(self)
+        if self.bvh_index != None:
+            self.world.bvh.remove(self)
         self.world.removeBlock(self)
 
     #checks if the block is colliding with anything,
@@ -195,6 +826,9 @@ class Block:
         for block in col_blocks:
             if self.collide_check(block, strict, ignoresolid):
                 return True
+        grid = self.world.tile_grid
+        if grid != None and grid.hitRange(self.x, self.y, self.width, self.height, strict, ignoresolid) != None:
+            return True
         return False
 
     #checks for a collision between this block and the other block. strict and ignoresolid mean the same thing as in colliding().
@@ -243,115 +877,125 @@ class Block:
         else:
             return not (block.x > self.x + self.width or block.x + block.width < self.x or block.y > self.y + self.height or block.y + block.height < self.y)
 
+    #checks if the blocks hitbox overlaps the area x, y, width, height (doesn't look at solid)
+    #strict means the same as in colliding()
+    def overlapsArea(self, x, y, width, height, strict = True):
+        if strict:
+            return not (self.x >= x + width or self.x + self.width <= x or self.y >= y + height or self.y + self.height <= y)
+        return not (self.x > x + width or self.x + self.width < x or self.y > y + height or self.y + self.height < y)
+
     #updates the chunks the block is inside.
     #should be called upon the creation of the block (it adds it in to the world) and every time the block moves.
+    #dynamic blocks just update their place in the worlds SweepAndPrune if it has one.
     def updateChunks(self):
-        oldchunks = list(self.chunks)
-        cx0, cy0 = math.floor(self.x/self.world.chunk_width), math.floor(self.y/self.world.chunk_height)
-        cx1, cy1 = math.floor((self.x+self.width)/self.world.chunk_width), math.floor((self.y+self.height)/self.world.chunk_height)
-        
-        self.chunks = []
-        for cx in range(min(cx0, cx1), max(cx0, cx1)+1):
-            for cy in range(min(cy0, cy1), max(cy0, cy1)+1):
-                self.chunks.append(self.world.getChunk(cx, cy))
-        #if cx0 == cx1 and cy0 == cy1:
-        #    self.chunks = [self.world.getChunk(cx0, cy0)]
-        #elif cx0 != cx1 and cy0 == cy1:
-        #    self.chunks = [self.world.getChunk(cx0, cy0), self.world.getChunk(cx1, cy0)]
-        #elif cx0 == cx1 and cy0 != cy1:
-        #    self.chunks = [self.world.getChunk(cx0, cy0), self.world.getChunk(cx0, cy1)]
-        #else:
-        #    self.chunks = [self.world.getChunk(cx0, cy0), self.world.getChunk(cx1, cy0), self.world.getChunk(cx0, cy1), self.world.getChunk(cx1, cy1)]
-
-        for chunk in oldchunks:
-            if not chunk in self.chunks:
-                chunk.remove(self)
+        if self.dynamic and self.world.sap != None:
+            if self.sap_key == None:
+                self.world.sap.add(self)
+                self.world.addBlock(self)
+            else:
+                self.world.sap.update(self)
+            return
+        world = self.world
+        #a static block that moves goes back in to the chunks
+        if self.bvh_index != None:
+            world.bvh.remove(self)
+        level = world.levelFor(self.width, self.height)
+        span = (level,) + world.chunkSpan(self.x, self.y, self.width, self.height, level)
+        if span == self.chunk_span:
+            return
+        world.addBlock(self)
+        cx0, cy0, cx1, cy1 = span[1:]
+        #only the chunks that have left or joined the span are touched
+        chunks = []
         for chunk in self.chunks:
-            if not chunk in oldchunks:
-                chunk.add(self)
+            if chunk.level != level or chunk.x < cx0 or chunk.x > cx1 or chunk.y < cy0 or chunk.y > cy1:
+                chunk.remove(self)
+            else:
+                chunks.append(chunk)
+        if self.chunk_span == None or self.chunk_span[0] != level:
+            ox0, oy0, ox1, oy1 = 1, 1, 0, 0
+        else:
+            ox0, oy0, ox1, oy1 = self.chunk_span[1:]
+        for cx in range(cx0, cx1+1):
+            for cy in range(cy0, cy1+1):
+                if cx < ox0 or cx > ox1 or cy < oy0 or cy > oy1:
+                    chunk = world.getChunk(cx, cy, level)
+                    chunk.add(self)
+                    chunks.append(chunk)
+        self.chunks = chunks
+        self.chunk_span = span
 
     #decides whether to use safe_move or move.
+    #move sweeps the block along its path (see World.shapeCast) so it can't tunnel however fast it goes, this just calls move.
     def clever_move(self, dx, dy, ignore_solid = False, strict = True, move_back = True, ignore_list = []):
-        if math.fabs(dx) > self.width or math.fabs(dy) > self.height:
-            return self.safe_move(dx, dy, ignore_solid, strict, move_back, ignore_list)
-        else:
-            return self.move(dx, dy, ignore_solid, strict, move_back, ignore_list)
+        return self.move(dx, dy, ignore_solid, strict, move_back, ignore_list)
 
-    #move function for when the block is moving quickly,
-    #checks for multiple collisions along the line of trajectory, can still miss collisions but is less likely to.
+    #used to step along quick moves to stop the block tunneling through things, move does this on its own now.
+    #kept for compatibility, just calls move.
     def safe_move(self, dx, dy, ignore_solid = False, strict = True, move_back = True, ignore_list = []):
-        x_moving = True
-        y_moving = True
-        while (math.fabs(dx) > self.width or math.fabs(dy) > self.height) and (x_moving or y_moving):
-            cdx = 0
-            if dx > self.width and dx > 0:
-                dx = dx - self.width
-                cdx = self.width
-            elif dx < self.width and dx < 0:
-                dx = dx + self.width
-                cdx = -self.width
-
-            cdy = 0
-            if dy > self.height and dy > 0:
-                dy = dy - self.height
-                cdy = self.height
-            elif dy < self.height and dy < 0:
-                dy = dy + self.height
-                cdy = -self.height
-                
-            results = self.move(cdx, cdy, ignore_solid, strict, move_back, ignore_list)
-            if not results[0]:
-                if move_back:
-                    dx = 0
-                x_moving = False
-            if not results[1]:
-                if move_back:
-                    dy = 0
-                y_moving = False
-                
-        if dx != 0 or dy != 0:
-            results = self.move(dx, dy, ignore_solid, strict, move_back, ignore_list)
-            if not results[0]:
-                x_moving = False
-            if not results[1]:
-                y_moving = False
-        return [x_moving, y_moving]
-
-    #simply collision detection, moves the block by dx and dy, checks for collisions then resolves any issues (moves to the appropriate location)
-    #uses a simply detection system of first moving along the x, resolving issues, then moving along the y, then resolving issues again.
-    def move(self, dx, dy, ignore_solid = False, strict = True, move_back = True, ignore_list = []):
-        col_blocks = self.get_blocks()
+        return self.move(dx, dy, ignore_solid, strict, move_back, ignore_list)
 
+    #moves the block by dx and dy, stopping it against anything in the way.
+    #first moves along the x, then along the y, each uses one shape cast (see World.shapeCast) so the whole path is checked.
+    #returns [x_moved, y_moved], which are false if the block hit something along that axis.
+    #move_back determines if the block stops at what it hit or carries on regardless, ignore_list is a list (or mask) of block types to ignore
+    def move(self, dx, dy, ignore_solid = False, strict = True, move_back = True, ignore_list = []):
+        exclude = typeMask(ignore_list, 0)
         results = [True, True]
         if dx != 0:
-            self.x = self.x + dx
-            for block in col_blocks:
-                if not block.get_type() in ignore_list:
-                    if self.collide_check(block, strict, ignore_solid):
-                        if move_back:
-                            if dx > 0:
-                                self.x = block.x - self.width
-                            else:
-                                self.x = block.x + block.width
-                        results[0] = False
-                #else:
-                #    print(block.get_type())
+            hit = self.world.shapeCast([self.x, self.y, self.width, self.height], dx, 0, self, strict, ALL_TYPES, ignore_solid, exclude)
+            if hit != None:
+                results[0] = False
+            if hit != None and move_back:
+                if dx > 0:
+                    self.x = hit[2].x - self.width
+                else:
+                    self.x = hit[2].x + hit[2].width
+            else:
+                self.x = self.x + dx
         if dy != 0:
-            self.y = self.y + dy
-            for block in col_blocks:
-                if not block.get_type() in ignore_list:
-                    if self.collide_check(block, strict, ignore_solid):
-                        if move_back:
-                            if dy > 0:
-                                self.y = block.y - self.height
-                            else:
-                                self.y = block.y + block.height
-                        results[1] = False
-                #else:
-                #    print(block.get_type())
+            hit = self.world.shapeCast([self.x, self.y, self.width, self.height], 0, dy, self, strict, ALL_TYPES, ignore_solid, exclude)
+            if hit != None:
+                results[1] = False
+            if hit != None and move_back:
+                if dy > 0:
+                    self.y = hit[2].y - self.height
+                else:
+                    self.y = hit[2].y + hit[2].height
+            else:
+                self.y = self.y + dy
         self.updateChunks()
         return results
 
+    #the attributes kept by saveState, subclasses add the ones that change while the world is running
+    SNAPSHOT = ("x", "y", "width", "height", "solid")
+
+    #whether the block can change while the world is running, only blocks that can are kept in snapshots (see saveState).
+    #dynamic blocks can, subclasses that change in other ways (toggling, opening) say so too
+    def canChange(self):
+        return self.dynamic
+
+    #gets the state of the block (the attributes in SNAPSHOT) so it can be put back with loadState
+    def saveState(self):
+        state = []
+        for name in self.SNAPSHOT:
+            value = getattr(self, name, None)
+            if isinstance(value, Vector):
+                value = value.copy()
+            state.append(value)
+        return state
+
+    #puts the block back in to a state from saveState, it only changes chunks if it has moved
+    def loadState(self, state):
+        box = (self.x, self.y, self.width, self.height)
+        for i in range(len(self.SNAPSHOT)):
+            value = state[i]
+            if isinstance(value, Vector):
+                value = value.copy()
+            setattr(self, self.SNAPSHOT[i], value)
+        if box != (self.x, self.y, self.width, self.height):
+            self.updateChunks()
+
     #simply moves the block and doesn't bother doing collision checks
     def simple_move(self, dx, dy):
         self.y = self.y + dy
@@ -370,15 +1014,18 @@ class Block:
 #almost functionally identical to the Block class except for the init function and
 #it uses a circular hitbox. Supports collision detection between normal Block classes.
 class CircleBlock(Block):
+    __slots__ = ("raw_x", "raw_y", "raw_centre_x", "raw_centre_y", "raw_radius", "radsqr")
+
     #world is the world the block is in
     #x, y is the centre of the block
     #radius is the radius of the blocks hitbox
     #blockid is the block's id (see world.nextID())
     def __init__(self, world, x, y, radius, blockid):
+        #the radius is needed to set x and y in Block.__init__
+        self.raw_radius = radius
         Block.__init__(self, world, x - radius, y - radius, radius * 2, radius * 2, blockid)
         self.raw_centre_x = x
         self.raw_centre_y = y
-        self.raw_radius = radius
         self.radsqr = self.raw_radius * self.raw_radius
 
         self.collision_priority = True
@@ -472,6 +1119,87 @@ class CircleBlock(Block):
         dist = (diffX*diffX) + (diffY*diffY)
         return dist < self.radsqr
 
+    def overlapsArea(self, x, y, width, height, strict = True):
+        closeX = max(x, min(x + width, self.centre_x))
+        closeY = max(y, min(y + height, self.centre_y))
+
+        diffX = self.centre_x - closeX
+        diffY = self.centre_y - closeY
+
+        dist = (diffX*diffX) + (diffY*diffY)
+        if strict:
+            return dist <= self.radsqr
+        return dist < self.radsqr
+
+#sweeps the box x, y, width, height by dx, dy against the box bx, by, bwidth, bheight
+#returns [time, axis] for the first contact (axis is 0 for x, 1 for y), or None if they don't meet during the move.
+#boxes that already overlap are hit at time 0 on the axis the box moves furthest along.
+#strict means the same as in Block.colliding(), if it's false touching counts as a hit.
+def sweepBox(x, y, width, height, dx, dy, bx, by, bwidth, bheight, strict = True):
+    if dx > 0:
+        entry_x, exit_x = (bx - (x + width)) / dx, (bx + bwidth - x) / dx
+    elif dx < 0:
+        entry_x, exit_x = (bx + bwidth - x) / dx, (bx - (x + width)) / dx
+    elif (strict and (bx >= x + width or bx + bwidth <= x)) or (not strict and (bx > x + width or bx + bwidth < x)):
+        return None
+    else:
+        entry_x, exit_x = -INFINITY, INFINITY
+
+    if dy > 0:
+        entry_y, exit_y = (by - (y + height)) / dy, (by + bheight - y) / dy
+    elif dy < 0:
+        entry_y, exit_y = (by + bheight - y) / dy, (by - (y + height)) / dy
+    elif (strict and (by >= y + height or by + bheight <= y)) or (not strict and (by > y + height or by + bheight < y)):
+        return None
+    else:
+        entry_y, exit_y = -INFINITY, INFINITY
+
+    entry, leave = max(entry_x, entry_y), min(exit_x, exit_y)
+    if entry < 0:
+        #already overlapping, it's hit straight away along the way the box is moving so nothing can pass through it
+        if leave > 0:
+            if math.fabs(dx) >= math.fabs(dy):
+                return [0, 0]
+            return [0, 1]
+        return None
+    if entry > leave or entry > 1:
+        return None
+    if strict and (entry == leave or entry == 1):
+        return None
+    if entry_x >= entry_y:
+        return [entry, 0]
+    return [entry, 1]
+
+#greedily merges the filled cells of a width by height grid in to rectangles.
+#cells is indexed by x + (y * width) and is true for filled cells, each row of cells is split in to runs and
+#each run is grown downwards while the rows below it are filled too.
+#returns a list of [x, y, width, height] rectangles in cells, every filled cell is covered by exactly one of them.
+def mergeRects(width, height, cells):
+    used = bytearray(width * height)
+    rects = []
+    for y in range(height):
+        row = y * width
+        x = 0
+        while x < width:
+            if not cells[row + x] or used[row + x]:
+                x += 1
+                continue
+            run = 1
+            while x + run < width and cells[row + x + run] and not used[row + x + run]:
+                run += 1
+            rows = 1
+            while y + rows < height:
+                below = (y + rows) * width + x
+                if not all(cells[i] and not used[i] for i in range(below, below + run)):
+                    break
+                rows += 1
+            for ry in range(y, y + rows):
+                for i in range(ry * width + x, ry * width + x + run):
+                    used[i] = 1
+            rects.append([x, y, run, rows])
+            x += run
+    return rects
+
 #gets the argument for the vector (x y) in degrees
 def getDegArg(x, y):
     if x == 0:
@@ -497,7 +1225,12 @@ def getArg(x, y):
     return math.radians(getDegArg(x, y))
 
 #vector class
+#the polar form (arg and mod) is only worked out when it's asked for, set x and y with setXY (or the in-place
+#methods) rather than directly if you use it, so it gets worked out again.
+#the methods returning a new vector are kept for convenience, the in-place ones (iadd, imul, clamp...) are for the per-frame physics.
 class Vector:
+    __slots__ = ("x", "y", "arg", "mod")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
@@ -542,11 +1275,15 @@ class Vector:
         self.y = self.mod*math.sin(self.arg)
         return self
 
+    #returns x and y as a tuple
+    def getXY(self):
+        return (self.x, self.y)
+
     #sets both x and y at the same time
     def setXY(self, x, y):
         self.x, self.y = x, y
-        self.arg = getArg(self.x, self.y)
-        self.mod = math.sqrt( (self.x*self.x) + (self.y*self.y) )
+        self.arg = None
+        self.mod = None
         return self
 
     #sets the x value
@@ -573,6 +1310,34 @@ class Vector:
     def addVec(self, vector):
         return Vector(vector.getX()+self.x, vector.getY()+self.y)
 
+    #adds x, y to the vector in place
+    def iadd(self, x, y):
+        self.x += x
+        self.y += y
+        self.arg = None
+        self.mod = None
+        return self
+
+    #adds another vector to the vector in place
+    def iaddVec(self, vector):
+        return self.iadd(vector.x, vector.y)
+
+    #multiplies the vector by a scalar in place
+    def imul(self, a):
+        self.x *= a
+        self.y *= a
+        self.arg = None
+        self.mod = None
+        return self
+
+    #clamps the vector in place using another vector (see capVector)
+    def clamp(self, vector):
+        self.x = min(vector.x, max(-vector.x, self.x))
+        self.y = min(vector.y, max(-vector.y, self.y))
+        self.arg = None
+        self.mod = None
+        return self
+
     #multiplies the vector by a scalar (returns a new vector)
     def mult(self, a):
         return Vector(self.x*a, self.y*a)
@@ -1,9 +1,17 @@
-import math, pygame, pycol, pyani, random, json
+import math, pygame, pycol, pyani, pymap, random, json
 from pycol import *
 from pyani import *
 
+#type bits for the block types used in queries (see pycol.typeBit)
+PLAYER = typeBit("player")
+SKULL = typeBit("skull")
+TRAP = typeBit("trap")
+TOGGLE_WALL = typeBit("toggle_wall")
+
 #simple class for hooking objects to events
 class Hook:
+    __slots__ = ()
+
     def call(self, event):
         return
 
@@ -11,6 +19,8 @@ class Hook:
 #see pyani.AnimationSet for an explanation of animation sets
 #base Tile class for the map, essentially the same as Block but introduces animation sets and uses a imagemanager with a tilesize given (see pyani.ImageManager)
 class Tile(Block):
+    __slots__ = ("tx", "ty", "tm", "aniset", "tileid", "in_grid")
+
     #aniset is the AnimationSet for that tile
     #tilemanager is the imagemanager for aniset (used for keeping track of tile_width and tile_height)
     def __init__(self, world, x, y, aniset, tilemanager, tileid = 0):
@@ -20,12 +30,36 @@ class Tile(Block):
         self.aniset = aniset
         self.tileid = tileid
         Block.__init__(self, world, x * self.tm.tile_width, y * self.tm.tile_height, self.tm.tile_width, self.tm.tile_height, world.nextID())
-        self.updateChunks()
+        #tiles go in to the level's tile grid instead of the chunks if it has one (see pycol.TileGrid)
+        self.in_grid = False
+        if world.tile_grid != None and world.tile_grid.add(self, x, y):
+            self.in_grid = True
+            world.addBlock(self)
+        else:
+            self.updateChunks()
 
     #see Block class
     def get_type(self):
         return "tile"
 
+    #sets whether or not the tile is solid, keeping the tile grid up to date
+    def setSolid(self, solid):
+        self.solid = solid
+        if self.in_grid:
+            self.world.tile_grid.setSolid(self.tx, self.ty, solid)
+
+    #see Block class (keeps the tile grid up to date)
+    def loadState(self, state):
+        Block.loadState(self, state)
+        self.setSolid(self.solid)
+
+    #see Block class
+    def destroy(self):
+        if self.in_grid:
+            self.world.tile_grid.remove(self.tx, self.ty)
+            self.in_grid = False
+        Block.destroy(self)
+
     #updates the size of the block to keep in line with tile_width and tile_height
     def updateSize(self):
         self.x = self.tx * self.tm.tilewidth
@@ -43,6 +77,10 @@ class Tile(Block):
 #see Tile class for further explanation of some variables used
 #base class for blocks which move (or just aren't constrained by the tile size)   
 class Entity(Block):
+    __slots__ = ("aniset", "em", "vel", "acc")
+
+    dynamic = True
+
     #entmanager is the imagemanager class for non-tilesize adjusted images in the game
     def __init__(self, world, x, y, width, height, aniset, entmanager):
         Block.__init__(self, world, x, y, width, height, world.nextID())
@@ -55,9 +93,8 @@ class Entity(Block):
 
     #see Block class (moves the vector)
     def update(self, elapsed):
-        self.vel = self.vel.addVec(self.acc.mult(elapsed))
-        movevel = self.vel.mult(elapsed)
-        self.move(movevel.x, movevel.y)
+        self.vel.iadd(self.acc.x * elapsed, self.acc.y * elapsed)
+        self.move(self.vel.x * elapsed, self.vel.y * elapsed)
 
     #see Block class
     def draw(self, target, offset):
@@ -68,6 +105,8 @@ class Entity(Block):
 #see Entity/Tile classes for further explanations of some variables used
 #simply checkpoint, if the player is within its hitbox it sets the spawn to the players current coordinates (see Level.setSpawn())
 class Checkpoint(Block):
+    __slots__ = ("aniset", "em")
+
     def __init__(self, world, x, y, width, height, aniset, entmanager):
         Block.__init__(self, world, x, y, width, height, world.nextID())
         self.aniset = aniset.loop("on")
@@ -83,7 +122,7 @@ class Checkpoint(Block):
         return 3
 
     def update(self, elapsed):
-        if self.world.checkArea(self.x, self.y, self.width, self.height, [], True, ["player"]):
+        if self.world.queryArea(self.x, self.y, self.width, self.height, self, True, PLAYER):
             self.world.setSpawn(self)
 
     def draw(self, target, offset):
@@ -94,16 +133,20 @@ class Checkpoint(Block):
 #see Checkpoint class
 #same as a checkpoint but finishes the level if the player is within its hitbox instead of setting the spawn.
 class FinishLine(Checkpoint):
+    __slots__ = ()
+
     def __init__(self, world, x, y, width, height, aniset, entmanager):
         Checkpoint.__init__(self, world, x, y, width, height, aniset, entmanager)
 
     def update(self, elapsed):
-        if self.world.checkArea(self.x, self.y, self.width, self.height, [], True, ["player"]):
+        if self.world.queryArea(self.x, self.y, self.width, self.height, self, True, PLAYER):
             self.world.finish()
 
 #see Entity/Tile classes for further explanation of variables used
 #essentially an entity block which damages the player if they collide with each other
 class Trap(Block):
+    __slots__ = ("aniset", "em", "damage")
+
     def __init__(self, world, x, y, width, height, aniset, entmanager, damage = 1):
         Block.__init__(self, world, x, y, width, height, world.nextID())
         self.aniset = aniset
@@ -127,6 +170,8 @@ class Trap(Block):
 #see Trap class
 #a trap block with a circular hitbox
 class CircleTrap(CircleBlock):
+    __slots__ = ("aniset", "em", "damage")
+
     def __init__(self, world, x, y, radius, aniset, entmanager, damage = 1):
         CircleBlock.__init__(self, world, x, y, radius, world.nextID())
         self.aniset = aniset
@@ -150,6 +195,10 @@ class CircleTrap(CircleBlock):
 #see CircleTrap
 #a saw trap, moves along a given path
 class Saw(CircleTrap):
+    __slots__ = ("speed", "pos_list", "arg_list", "dist_list", "step", "curdist", "vel")
+
+    dynamic = True
+
     #pos_list is the list of positions the saw will move between
     #speed is the speed at which the saw will move
     #radius the the radius of the saws hitbox
@@ -174,6 +223,8 @@ class Saw(CircleTrap):
             self.curdist = 0
             self.nextStep()
 
+    SNAPSHOT = Block.SNAPSHOT + ("step", "curdist", "vel")
+
     #use if the list of position has been changed, updates the saws path
     def updatePosList(self):
         if len(self.pos_list) > 1:
@@ -207,24 +258,44 @@ class Saw(CircleTrap):
 
     def update(self, elapsed):
         if len(self.pos_list) > 1:
-            move_vec = self.vel.mult(elapsed)
-            self.simple_move(move_vec.x, move_vec.y)
+            dx, dy = self.vel.x * elapsed, self.vel.y * elapsed
+            self.simple_move(dx, dy)
             #print("HI:",self.vel,":",self.x)
-            self.curdist += move_vec.getMod()
+            self.curdist += math.sqrt((dx*dx) + (dy*dy))
             if self.curdist >= self.dist_list[self.step]:
                 self.nextStep()
 
 #see Tile class
 #basic wall tile, either perminantly solid or is a toggle-wall which can be toggled between solid and non-solid
 class Wall(Tile):
+    __slots__ = ("typename", "last_state")
+
     def __init__(self, world, x, y, aniset, tilemanager, tileid = 0):
+        #the type has to be known before the tile is added to the tile grid
+        self.typename = "wall"
+        if tileid == 1 or tileid == 2:
+            self.typename = "toggle_wall"
+
         Tile.__init__(self, world, x, y, aniset, tilemanager, tileid)
         self.aniset = aniset.loop("on")
         self.last_state = world.state
 
-        self.typename = "wall"
-        if tileid == 1 or tileid == 2:
-            self.typename = "toggle_wall"
+    SNAPSHOT = Block.SNAPSHOT + ("last_state",)
+
+    #see Block class (only toggle walls change)
+    def canChange(self):
+        return self.tileid != 0
+
+    #see Block class (only redrawn if it has been toggled)
+    def loadState(self, state):
+        solid = self.solid
+        Tile.loadState(self, state)
+        if self.solid:
+            self.aniset.loop("on")
+        else:
+            self.aniset.loop("off")
+        if solid != self.solid:
+            self.world.redraw(self)
 
     def get_priority(self):
         return 1
@@ -234,16 +305,17 @@ class Wall(Tile):
 
     def update(self, elapsed):
         if self.world.state != self.last_state and self.tileid != 0:
+            self.world.redraw(self)
             if self.world.state == self.tileid or self.tileid == 0:
                 self.aniset.loop("on")
-                self.solid = True
+                self.setSolid(True)
                 if self.world.player != None:
                     if self.collides(self.world.player):
                         self.world.killPlayer()
                         return True
             else:
                 self.aniset.loop("off")
-                self.solid = False
+                self.setSolid(False)
             self.last_state = self.world.state
     
     def draw(self, target, offset):
@@ -252,9 +324,26 @@ class Wall(Tile):
         ry = self.y - offset.y
         target.blit(self.aniset.get(), [rx, ry])
 
+#invisible collision block made of several walls merged together (see Level.bakeColliders)
+#the walls it covers are still drawn by themselves, this is only what gets collided with.
+class Collider(Block):
+    __slots__ = ()
+
+    def __init__(self, world, x, y, width, height):
+        Block.__init__(self, world, x, y, width, height, world.nextID())
+        self.updateChunks()
+
+    def get_priority(self):
+        return 1
+
+    def get_type(self):
+        return "wall"
+
 #essentially a Tile block.
 #button block, related to the door block. if pressed the doors of the same type will open.
 class Button(Block):
+    __slots__ = ("press_bounds", "direction", "pressed", "button_lock", "tx", "ty", "tm", "aniset", "doorid")
+
     #direction is the direction the button is facing (default = up, 1 = right, 2 = down, 3 = left)
     #doorid is the type of door it will open (the colour of the lock/button determine their doorids)
     #button_lock determins if the button will lock in place once pressed or if it will stop being pressed once nothing is pressing it
@@ -283,16 +372,33 @@ class Button(Block):
         self.solid = False
         self.updateChunks()
 
+    SNAPSHOT = Block.SNAPSHOT + ("pressed",)
+
+    #see Block class
+    def canChange(self):
+        return True
+
+    #see Block class (only changes how the button looks, the doors put themselves back)
+    def loadState(self, state):
+        Block.loadState(self, state)
+        if self.pressed:
+            self.aniset.loop("down_"+str(self.direction)+"_"+str(self.doorid))
+        else:
+            self.aniset.loop("up_"+str(self.direction)+"_"+str(self.doorid))
+        self.world.redraw(self)
+
     #switches the button's state to pressed
     def pressButton(self):
         self.pressed = True
         self.aniset.loop("down_"+str(self.direction)+"_"+str(self.doorid))
+        self.world.redraw(self)
         self.world.openDoors(self.doorid)
 
     #switches the button's state to unpressed
     def unpressButton(self):
         self.pressed = False
         self.aniset.loop("up_"+str(self.direction)+"_"+str(self.doorid))
+        self.world.redraw(self)
         self.world.closeDoors(self.doorid)
 
     def get_priority(self):
@@ -303,7 +409,7 @@ class Button(Block):
 
     def update(self, elapsed):
         if not self.pressed or not self.button_lock:
-            if self.world.checkArea(self.press_bounds[0], self.press_bounds[1], self.press_bounds[2], self.press_bounds[3], [], True, ["player", "skull"], True):
+            if self.world.queryArea(self.press_bounds[0], self.press_bounds[1], self.press_bounds[2], self.press_bounds[3], self, True, PLAYER | SKULL, True):
                 self.pressButton()
             else:
                 self.unpressButton()
@@ -316,6 +422,8 @@ class Button(Block):
 #essentially a tile block
 #links to a button, toggles between solid and non-solid depending on state of button
 class Door(Block):
+    __slots__ = ("direction", "open", "tx", "ty", "tm", "aniset", "aniset_lock", "lock_offset", "doorid")
+
     #direction is the direction the door is facing (default = up, 1 = right, 2 = down, 3 = left)
     #doorid is the door type (see Button __init__)
     def __init__(self, world, x, y, aniset, aniset_lock, tilemanager, direction, doorid = 0): 
@@ -343,17 +451,33 @@ class Door(Block):
         self.doorid = doorid
         self.updateChunks()
 
+    SNAPSHOT = Block.SNAPSHOT + ("open",)
+
+    #see Block class
+    def canChange(self):
+        return True
+
+    #see Block class
+    def loadState(self, state):
+        Block.loadState(self, state)
+        if self.open:
+            self.openDoor()
+        else:
+            self.closeDoor()
+
     #sets the doors state to open
     def closeDoor(self):
         self.open = False
         self.aniset = self.aniset.loop("closed_"+str(self.direction))
         self.solid = True
+        self.world.redraw(self)
 
     #sets the doors state to closed
     def openDoor(self):
         self.open = True
         self.aniset = self.aniset.loop("open_"+str(self.direction))
         self.solid = False
+        self.world.redraw(self)
 
     def get_priority(self):
         return 1
@@ -369,19 +493,18 @@ class Door(Block):
             target.blit(self.aniset_lock.get(), [rx+self.lock_offset[0], ry+self.lock_offset[1]])
 
 #background tile, purely cosmetic.
-class BackgroundTile(Block):
+#it isn't a Block, it goes in the level's decoration layer (see Level.addDecoration) so it never enters the collision world
+#and is only ever drawn, never updated.
+class BackgroundTile:
+    __slots__ = ("real_x", "real_y", "aniset")
+
     def __init__(self, world, x, y, aniset, tilemanager, settype = -1):
-        Block.__init__(self, world, -100, -100, 0, 0, world.nextID())
         self.real_x = x * tilemanager.tile_width
         self.real_y = y * tilemanager.tile_height
         if settype == -1:
             settype = random.randint(0, 3)
         self.aniset = aniset.loop(str(settype))
-        self.updateChunks()
-        self.solid = False
-
-    def get_type(self):
-        return "background"
+        world.addDecoration(self)
 
     def draw(self, target, offset):
         rx = self.real_x - offset.x
@@ -392,6 +515,10 @@ class BackgroundTile(Block):
 #drops whenever a player dies (see level.skull_cap for the amount of skulls that can be on the level at once)
 #persitent even through level restarted, can press buttons and be kicked about. Will fall through toggle-walls regardless of their toggles state
 class Skull(Block):
+    __slots__ = ("facing_left", "aniset", "vel", "acc", "terminal_vel", "terminal_vel_fall", "cds", "airborne")
+
+    dynamic = True
+
     #vel is the skulls started velocity
     #facing_left determines if the skull is facing left or right (purely aesthetic)
     def __init__(self, world, x, y, width, height, aniset, vel, facing_left = True):
@@ -399,12 +526,13 @@ class Skull(Block):
         self.facing_left = facing_left
         self.aniset = aniset
         self.solid = False
-        self.vel = vel
+        #the velocity is changed in place so it can't be shared with the player
+        self.vel = vel.copy()
         self.acc = Vector(-vel.x, 980)
         self.terminal_vel = Vector(450, 300)
         self.terminal_vel_fall = Vector(450, 700)
         self.updateChunks()
-        self.cds = Cooldowns().create("bounce_x", 200).start().create("bounce_y", 400).start()
+        self.cds = Cooldowns(world.game.clock).create("bounce_x", 200).start().create("bounce_y", 400).start()
         self.airborne = True
 
         if facing_left:
@@ -430,7 +558,7 @@ class Skull(Block):
 
     #hacked together pseudo-physics make it bounce and stuff. Messy and confusing, but it works.
     def update(self, elapsed):
-        if self.world.checkArea(self.x+1, self.y, self.width-2, self.height+1, [self], True, None, False, ["player", "toggle_wall"]):
+        if self.world.queryArea(self.x+1, self.y, self.width-2, self.height+1, self, True, ALL_TYPES, False, False, PLAYER | TOGGLE_WALL):
             if self.airborne and self.cds.check("bounce_y"):
                 self.vel.y = -self.vel.y * 0.5
                 self.cds.start()
@@ -439,7 +567,7 @@ class Skull(Block):
             self.airborne = False
         else:
             self.airborne = True
-        if self.world.checkArea(self.x-1, self.y+1, self.width+2, self.height-2, [self], True, None, False, ["player", "toggle_wall"]):
+        if self.world.queryArea(self.x-1, self.y+1, self.width+2, self.height-2, self, True, ALL_TYPES, False, False, PLAYER | TOGGLE_WALL):
             if math.fabs(self.vel.x) < 10:
                 self.vel.x = 0
             elif self.cds.check("bounce_x"):
@@ -453,20 +581,20 @@ class Skull(Block):
         elif not self.facing_left and self.vel.x <= 0:
             self.acc.x = 0
             self.vel.x = 0
-        players = self.world.checkAndReturnArea(self.x-2, self.y-2, self.width+4, self.height+4, [self], True, ["player"])
+        players = self.world.queryArea(self.x-2, self.y-2, self.width+4, self.height+4, self, True, PLAYER, False, True)
         if len(players) > 0:
-            vel_mod = Vector(0, 0)
+            mod_x, mod_y = 0, 0
             for player in players:
-                vel_mod = vel_mod.addVec(player.vel.mult(0.35))
-            self.vel = self.vel.addVec(vel_mod)
+                mod_x += player.vel.x * 0.35
+                mod_y += player.vel.y * 0.35
+            self.vel.iadd(mod_x, mod_y)
             self.updateVelX()
-        self.vel = self.vel.addVec(self.acc.mult(elapsed))
+        self.vel.iadd(self.acc.x * elapsed, self.acc.y * elapsed)
         if self.vel.y > 0:
-            self.vel = self.vel.capVector(self.terminal_vel_fall)
+            self.vel.clamp(self.terminal_vel_fall)
         else:
-            self.vel = self.vel.capVector(self.terminal_vel)
-        moveamt = self.vel.mult(elapsed)
-        self.clever_move(moveamt.x, moveamt.y, False, True, True, ["player","toggle_wall"])
+            self.vel.clamp(self.terminal_vel)
+        self.clever_move(self.vel.x * elapsed, self.vel.y * elapsed, False, True, True, PLAYER | TOGGLE_WALL)
 
     def draw(self, target, offset):
         rx = self.x - offset.x
@@ -475,6 +603,8 @@ class Skull(Block):
 
 #simple spike trap, walk on it an you die. see Trap class
 class Spike(Trap):
+    __slots__ = ()
+
     def __init__(self, world, x, y, width, height, aniset, entmanager):
         Trap.__init__(self, world, x, y, width, height, aniset, entmanager, 1)
         self.aniset.loop("on")
@@ -483,6 +613,10 @@ class Spike(Trap):
 #see Trap and Entity classes
 #(fired out of turrets)
 class Bullet(Trap):
+    __slots__ = ("vel", "dead")
+
+    dynamic = True
+
     #vel is the starting velocity of the bullet
     def __init__(self, world, x, y, width, height, aniset, entmanager, vel):
         Trap.__init__(self, world, x, y, width, height, aniset, entmanager, 1)
@@ -490,23 +624,26 @@ class Bullet(Trap):
         self.vel = vel
         self.dead = False
 
+    #bullets that leave the loaded regions of a streamed level are destroyed, there's nothing out there for them to hit
     def update(self, elapsed):
-        if self.dead:
+        if self.dead or not self.world.isLoaded(self.x, self.y):
             self.destroy()
         else:
-            moveamt = self.vel.mult(elapsed)
-            result = self.clever_move(moveamt.x, moveamt.y, False, False, True)
+            result = self.clever_move(self.vel.x * elapsed, self.vel.y * elapsed, False, False, True)
             if not result[0] or not result[1]:
                 self.dead = True
 
 #trap-tile combo, is by itself just a normal Wall but periodically fires bullets out at a given direction
 class Turret(Tile):
+    __slots__ = ("cds", "cd_offset", "direction", "bul_vel", "bul_off")
+
     #direction is the direction the bullets are fired out (0 = up, 1 = right, 2 = down, 3 = left)
     #cd_offset is the amount the cooldown for firing the bullets if offset by (to make different turrets fire out of sync)
     def __init__(self, world, x, y, aniset, tilemanager, direction, cd_offset = 0):
         Tile.__init__(self, world, x, y, aniset, tilemanager, 10)
         self.aniset.loop("t"+str(direction))
-        self.cds = Cooldowns().create("shoot", 750).start().offset(cd_offset)
+        self.cds = Cooldowns(world.game.clock).create("shoot", 750).start().offset(cd_offset)
+        self.cd_offset = cd_offset
         self.direction = direction
         self.bul_vel = Vector(0,0)
         self.bul_off = [0,0]
@@ -527,6 +664,15 @@ class Turret(Tile):
     def get_type(self):
         return "turret"
 
+    #see Block class (its cooldown is restarted with the level)
+    def canChange(self):
+        return True
+
+    #see Block class (restarts the cooldown, as if the turret had just been made)
+    def loadState(self, state):
+        Tile.loadState(self, state)
+        self.cds.start("shoot").offset(self.cd_offset)
+
     def update(self, elapsed):
         if self.cds.check("shoot"):
             Bullet(self.world, self.x + self.bul_off[0], self.y + self.bul_off[1], 10, 10, self.world.game.getAniSet("bullet"), self.world.game.entmanager, self.bul_vel.copy())
@@ -534,6 +680,8 @@ class Turret(Tile):
 
 #the player class. see Entity and Skull classes
 class Player(Entity, Hook):
+    __slots__ = ("terminal_vel", "terminal_air", "max_jumps", "jumps", "cds", "jump_input", "health", "was_grounded", "jumping", "facing_left")
+
     def __init__(self, world, x, y, width, height, aniset, entmanager):
         Entity.__init__(self, world, x, y, width, height, aniset, entmanager)
         self.terminal_vel = Vector(1500, 1500)
@@ -542,7 +690,7 @@ class Player(Entity, Hook):
         self.acc.x = 0
         self.max_jumps = 10
         self.jumps = self.max_jumps
-        self.cds = Cooldowns()
+        self.cds = Cooldowns(world.game.clock)
         self.cds.create("jump", 100).start()
         self.cds.create("airmove", 200).start()
         self.aniset.loop("stand_left")
@@ -569,8 +717,8 @@ class Player(Entity, Hook):
     def update(self, elapsed):
         move_block = False
         acc_mod = 1
-        press = pygame.key.get_pressed()
-        grounded = self.world.checkArea(self.x+1, self.y, self.width-2, self.height+1, [self], True)
+        press = self.world.game.getPressed()
+        grounded = self.world.checkArea(self.x+1, self.y, self.width-2, self.height+1, self, True)
         if not grounded and self.was_grounded and not self.jumping and ( not ( press[pygame.K_d] or press[pygame.K_a] or press[pygame.K_LEFT] or press[pygame.K_RIGHT]) or press[pygame.K_s] or press[pygame.K_DOWN]):
             self.vel.x = 0
         if grounded and self.jumping:
@@ -579,7 +727,7 @@ class Player(Entity, Hook):
         if (press[pygame.K_a] or press[pygame.K_LEFT]):# and self.cds.check("airmove"):
             if grounded:
                 self.vel.x = -200
-            elif self.world.checkArea(self.x, self.y+1, self.width-1, self.height-2, [self], False) and self.cds.check("airmove"):
+            elif self.world.checkArea(self.x, self.y+1, self.width-1, self.height-2, self, False) and self.cds.check("airmove"):
                 #move_block = True
                 if self.vel.y >= 0:
                     acc_mod = 0.1
@@ -591,7 +739,7 @@ class Player(Entity, Hook):
         if (press[pygame.K_d] or press[pygame.K_RIGHT]):# and self.cds.check("airmove"):
             if grounded:
                 self.vel.x = 200
-            elif self.world.checkArea(self.x+1, self.y+1, self.width-1, self.height-2, [self], False) and self.cds.check("airmove"):
+            elif self.world.checkArea(self.x+1, self.y+1, self.width-1, self.height-2, self, False) and self.cds.check("airmove"):
                 #move_block = True
                 if self.vel.y >= 0:
                     acc_mod = 0.1
@@ -612,7 +760,7 @@ class Player(Entity, Hook):
                 self.cds.start()
                 move_block = False
                 self.jumping = True
-            elif self.world.checkArea(self.x-1, self.y, self.width, self.height, [self]):
+            elif self.world.checkArea(self.x-1, self.y, self.width, self.height, self):
                 self.vel.y = -320
                 self.vel.x = 330
                 self.acc.x = 0
@@ -621,7 +769,7 @@ class Player(Entity, Hook):
                 self.cds.start("airmove")
                 move_block = False
                 self.jumping = True
-            elif self.world.checkArea(self.x+1, self.y, self.width, self.height, [self]):
+            elif self.world.checkArea(self.x+1, self.y, self.width, self.height, self):
                 self.vel.y = -320
                 self.vel.x = -330
                 self.acc.x = 0
@@ -634,26 +782,26 @@ class Player(Entity, Hook):
 
         if grounded:
             self.acc.x = 0
-        self.vel = self.vel.addVec(self.acc.mult(elapsed*acc_mod))
+        scale = elapsed*acc_mod
+        self.vel.iadd(self.acc.x * scale, self.acc.y * scale)
         
         if grounded:
-            self.vel = self.vel.capVector(self.terminal_vel)
+            self.vel.clamp(self.terminal_vel)
         else:
-            self.vel = self.vel.capVector(self.terminal_air)
+            self.vel.clamp(self.terminal_air)
         if self.vel.x > 0:
             self.facing_left = False
         elif self.vel.x < 0:
             self.facing_left = True
         #print(self.vel)
-        diff = self.vel.mult(elapsed)
-        results = self.clever_move(diff.x, diff.y)
+        results = self.clever_move(self.vel.x * elapsed, self.vel.y * elapsed)
         if results[1] == False:
             self.vel.y = 0
             self.jumps = self.max_jumps
         self.jump_input = False
         self.was_grounded = grounded
 
-        traps = self.world.checkAndReturnArea(self.x, self.y, self.width, self.height, [self], False, ["trap"], True, True)
+        traps = self.world.queryArea(self.x, self.y, self.width, self.height, self, False, TRAP, True, True)
         #print(len(traps))
         for trap in traps:
             self.health-=trap.damage
@@ -678,10 +826,7 @@ class Player(Entity, Hook):
             self.aniset.loop("walk_right")
         #print(self.vel)
         #print(self.vel)
-        #self.world.offset.x = max(0, min(self.world.map_width - self.world.game.screen.get_width(), int(self.x + (self.width/2) - (self.world.game.screen.get_width()/2))))
-        #self.world.offset.y = max(0, min(int(self.world.map_height - (self.world.game.screen.get_height()/2)), int(self.y + (self.height/2) - (self.world.game.screen.get_height()/2))))
-        #self.world.offset.x = self.x + (self.width/2) - (self.world.game.screen.get_width()/2)
-        #self.world.offset.y = self.y + (self.height/2) - (self.world.game.screen.get_height()/2)
+        #the camera follows the player (see Level.updateCamera)
 
         
 #the main game class, container for all the information about the currently running game
@@ -690,13 +835,39 @@ class Game:
     #tile_sizer is the class used in tilemanager to fit tiles to the required size
     #chunk_width, chunk_height are the chunk dimensions (see pycol.World class)
     #background is the background image (unused)
-    def __init__(self, width, height, tile_sizer, chunk_width, chunk_height, background):
+    #sweep_and_prune determines if levels keep moving blocks in a sweep-and-prune broadphase (see pycol.SweepAndPrune)
+    #hierarchical_grid determines if levels use a hierarchical grid of chunks (see pycol.World)
+    #static_bvh determines if levels move their static blocks in to a bounding volume hierarchy once loaded (see pycol.StaticBVH)
+    #tune_chunks determines if levels pick their own chunk size when they're first loaded (see pycol.World.tuneChunkSize)
+    #physics_rate is how many times a second the level is updated and max_steps is the most updates that are run in one frame (see update)
+    #clock is where the cooldowns and animations read the time from, the real time if None is given (see pyani.RealClock/SteppedClock)
+    #bake_colliders determines if levels merge their walls in to bigger blocks to collide with (see Level.bakeColliders), it's off by default
+    #as looking walls up in the tile grid is quicker than going through fewer, bigger blocks (see benchmarks/bench_colliders.py)
+    def __init__(self, width, height, tile_sizer, chunk_width, chunk_height, background, sweep_and_prune = True, hierarchical_grid = False, static_bvh = True, tune_chunks = False, physics_rate = 120, max_steps = 5, clock = None, bake_colliders = False):
         self.tilemanager = ImageManager(tile_sizer)
         self.entmanager = ImageManager()
         self.anisets = {}
         self.screen = pygame.display.set_mode((width, height))
         self.chunk_width = chunk_width
         self.chunk_height = chunk_height
+        self.sweep_and_prune = sweep_and_prune
+        self.hierarchical_grid = hierarchical_grid
+        self.static_bvh = static_bvh
+        self.tune_chunks = tune_chunks
+        self.bake_colliders = bake_colliders
+        #recorded query trace (see pycol.World.startTrace) for levels to tune their chunk size with, None uses the blocks in the level
+        self.query_trace = None
+        #where the level puts everything it draws each frame (see RenderQueue)
+        self.render_queue = RenderQueue()
+        #the time each update of the level covers, and the time that's passed which hasn't been updated yet (see update)
+        self.step_time = 1.0 / physics_rate
+        self.max_steps = max_steps
+        self.accumulator = 0
+        if clock == None:
+            clock = RealClock()
+        self.clock = clock
+        #the keys being held down, read from pygame if None (see getPressed)
+        self.pressed = None
         self.width = width
         self.height = height
         self.background = background
@@ -720,11 +891,11 @@ class Game:
 
     #gets an animation set with the given name
     def getAniSet(self, name):
-        return self.anisets[name].copy()
+        return self.anisets[name].copy(self.clock)
 
     #loads a level and starts it, level_name and world_name are for save file information,
     #load_dat is the data to load the level with, load_type is the type of loading to do
-    # (JSON or image, image is not up to date right now so only ever use JSON)
+    # (JSON, binary or image, image is not up to date right now so only ever use JSON or binary)
     def loadLevel(self, level_name, world_name, load_dat, load_type, set_level = True):
         self.level_name = level_name
         self.world_name = world_name
@@ -733,10 +904,25 @@ class Game:
             self.setLevel(level)
         return level
 
+    #loads a level from a file in the .tmd JSON format, the binary format or a region file (see pymap) and starts it if set_level is True
+    #region files are streamed from the file as the level is played (see Level.load_regions)
+    def loadLevelFile(self, level_name, world_name, filename, set_level = True):
+        f = open(filename, "rb")
+        data = f.read(len(pymap.REGION_MAGIC))
+        if pymap.isRegions(data):
+            f.close()
+            return self.loadLevel(level_name, world_name, pymap.RegionFile(filename), Level.REGION_LOAD, set_level)
+        data = data + f.read()
+        f.close()
+        if pymap.isMap(data):
+            return self.loadLevel(level_name, world_name, pymap.unpack(data), Level.MAP_LOAD, set_level)
+        return self.loadLevel(level_name, world_name, json.loads(data.decode("utf-8")), Level.JSON_LOAD, set_level)
+
     #sets the current level
     def setLevel(self, level):
         self.level = level
         self.level.display = self.screen
+        self.accumulator = 0
 
     #saves the completion time for the current level (timer is how long it took)
     def save(self, timer):
@@ -769,9 +955,34 @@ class Game:
     def tick(self, elapsed):
         self.screen.fill([255,255,255])
         #self.screen.blit(self.background, [0,0])
+        self.clock.advance(elapsed)
         self.level.tick(elapsed, self.paused)
         pygame.display.flip()
 
+    #updates the level in fixed steps of step_time for the elapsed seconds, the time left over is kept for the next call.
+    #at most max_steps are run, any more time than that is dropped so the game slows down instead of falling further behind. returns the number of steps run
+    def update(self, elapsed):
+        self.accumulator = min(self.accumulator + elapsed, self.step_time * self.max_steps)
+        steps = 0
+        while self.accumulator >= self.step_time:
+            self.clock.advance(self.step_time)
+            self.level.step(self.step_time, self.paused)
+            self.accumulator -= self.step_time
+            steps += 1
+        return steps
+
+    #draws the level, with the things that move part of the way between the last two steps by how much time is left over (see update)
+    def render(self):
+        self.screen.fill([255,255,255])
+        self.level.render(self.screen, self.accumulator / self.step_time)
+        pygame.display.flip()
+
+    #gets the keys being held down, indexed by the pygame key constants like pygame.key.get_pressed
+    def getPressed(self):
+        if self.pressed != None:
+            return self.pressed
+        return pygame.key.get_pressed()
+
     #adds a hook to an event (see Hook/Player classes)
     def addHook(self, hook, eventtypes):
         if type(eventtypes) != list:
@@ -794,17 +1005,88 @@ class Game:
             for hook in hook_list:
                 hook.call(event)
 
+#the order blocks are drawn in, by priority and then the order they were made in (see Level.draw)
+def drawOrder(block):
+    return (block.get_priority(), block.blockid)
+
+#collects everything being drawn in to a frame and draws it with one Surface.blits call per priority layer.
+#blocks are added to it and it's passed to their draw(target, offset) in place of the surface, it only needs the blit method.
+#what's blitted straight on to it before the blocks (like decorations) goes underneath all of them.
+class RenderQueue:
+    __slots__ = ("target", "offset", "view", "layers", "batch", "count")
+
+    def __init__(self):
+        self.target = None
+        self.offset = None
+        self.view = None
+        self.layers = {}
+        self.batch = []
+        self.count = 0
+
+    #starts drawing on to target with the camera at offset, blocks more than margin outside of the target aren't drawn
+    def begin(self, target, offset, margin = 0):
+        self.target = target
+        self.offset = offset
+        self.view = [offset.x - margin, offset.y - margin, offset.x + target.get_width(), offset.y + target.get_height()]
+        self.layers = {}
+        self.batch = []
+        self.count = 0
+        return self
+
+    #see pygame.Surface.blit, queues the surface to be drawn at dest
+    def blit(self, surface, dest):
+        self.batch.append((surface, dest))
+
+    #adds a block to its priority layer if it can be seen, returns whether it was added
+    def add(self, block):
+        view = self.view
+        if block.x >= view[2] or block.x + block.width <= view[0] or block.y >= view[3] or block.y + block.height <= view[1]:
+            return False
+        priority = block.get_priority()
+        if not priority in self.layers:
+            self.layers[priority] = []
+        self.layers[priority].append(block)
+        return True
+
+    #blits what's been queued so far
+    def flushBatch(self):
+        if len(self.batch) > 0:
+            self.target.blits(self.batch, False)
+            self.count += len(self.batch)
+            self.batch = []
+
+    #draws everything queued, each layer in the order the blocks were made in. returns the number of blits
+    def flush(self):
+        self.flushBatch()
+        for priority in sorted(self.layers.keys()):
+            layer = self.layers[priority]
+            layer.sort(key = drawOrder)
+            for block in layer:
+                block.draw(self, self.offset)
+            self.flushBatch()
+        self.layers = {}
+        return self.count
+
 #level class, more complicated version of pycol.World
 class Level(World):
     #image loading type constants
     IMAGE_LOAD = 0
     JSON_LOAD = 1
+    #binary level (see pymap), load_dat is a pymap.LevelMap
+    MAP_LOAD = 2
+    #region file (see pymap), load_dat is a pymap.RegionFile and only the regions around the player and screen are loaded
+    REGION_LOAD = 3
+    #how many regions can be loaded ahead of time each tick (see streamRegions)
+    REGIONS_PER_TICK = 1
+    #the size of the cells the blocks that don't move and the decorations are kept in for drawing (see addDrawable)
+    DRAW_CHUNK_WIDTH = 256
+    DRAW_CHUNK_HEIGHT = 256
     #game is the Game class for the currently running game
     #load_dat is the data to load the level with
     #see pycol.World for information on chunk_width and chunk_height
     #see Game.loadLevel for information on load_type
     def __init__(self, game, load_dat, chunk_width, chunk_height, load_type = 0):
-        World.__init__(self, chunk_width, chunk_height)
+        World.__init__(self, chunk_width, chunk_height, game.sweep_and_prune, game.hierarchical_grid)
         self.load_dat = load_dat
         self.load_type = load_type
         self.game = game
@@ -813,6 +1095,25 @@ class Level(World):
         self.level_timer = 0
         self.spawn = None
         self.spawn_tile = None
+        #the result of tuning the chunk size, None until it's tuned (see finishLoad)
+        self.chunk_tuning = None
+        #the state of the blocks that can change once loaded and the blocks added since then (see takeSnapshot)
+        self.snapshot = None
+        self.created = set()
+        #the regions that are loaded, [blocks, decorations] for each (rx, ry). None unless the level is streamed (see load_regions)
+        self.regions = None
+        #[blocks, decorations] of the region being loaded and the set of blocks of the regions being unloaded (see loadRegion/unloadRegion)
+        self.loading_region = None
+        self.unloading = None
+        #the draw cells, [decorations, blocks] for each chunkKey, the blocks that move (which are always checked) and how far
+        #something drawn in a cell can reach outside of it (see addDrawable and visibleChunks)
+        self.draw_chunks = {}
+        self.moving = []
+        self.draw_margin = 0
+        #where the blocks that move were before the last step, to draw them between there and where they are now (see render)
+        self.previous = {}
+        #the pictures of what doesn't move in each draw cell on screen, None if there's nothing to draw there (see bakeChunk)
+        self.baked = {}
         self.restart()
 
     #kills the player and restarts the level (keeping skulls and respawning you at a checkpoint if you reached one)
@@ -840,6 +1141,179 @@ class Level(World):
             self.doors[door.doorid] = []
         self.doors[door.doorid].append(door)
 
+    #adds a purely visual object to the decoration layer, it only needs a draw(target, offset) method.
+    #decorations are drawn underneath all the blocks and aren't part of the collision world (see BackgroundTile)
+    def addDecoration(self, decoration):
+        self.decorations.append(decoration)
+        self.drawChunk(decoration.real_x, decoration.real_y)[0].append(decoration)
+        self.draw_margin = max(self.draw_margin, self.game.tilemanager.tile_width, self.game.tilemanager.tile_height)
+        self.redrawArea(decoration.real_x, decoration.real_y, 0, 0)
+        if self.loading_region != None:
+            self.loading_region[1].append(decoration)
+
+    #see pycol.World, also keeps track of which region the block was loaded with and adds it to be drawn
+    def addBlock(self, block):
+        if block in self.block_set:
+            return
+        World.addBlock(self, block)
+        self.addDrawable(block)
+        if self.snapshot != None:
+            self.created.add(block)
+        if self.loading_region != None:
+            self.loading_region[0].append(block)
+
+    #see pycol.World, while regions are being unloaded the blocks are only taken out of the priority lists once at the end (see unloadRegion)
+    def removeBlock(self, block):
+        if block in self.block_set:
+            self.removeDrawable(block)
+        self.created.discard(block)
+        if self.unloading != None and block in self.block_set:
+            self.block_set.remove(block)
+            self.unloading.add(block)
+        else:
+            World.removeBlock(self, block)
+
+    #see pycol.World, also forgets everything that was being drawn
+    def reset(self):
+        World.reset(self)
+        self.draw_chunks = {}
+        self.moving = []
+        self.baked = {}
+
+    #gets the draw cell [decorations, blocks] the point x, y is in, making it if it doesn't exist
+    def drawChunk(self, x, y):
+        key = chunkKey(int(math.floor(x / Level.DRAW_CHUNK_WIDTH)), int(math.floor(y / Level.DRAW_CHUNK_HEIGHT)))
+        chunk = self.draw_chunks.get(key)
+        if chunk == None:
+            chunk = [[], []]
+            self.draw_chunks[key] = chunk
+        return chunk
+
+    #adds a block to be drawn, blocks that don't move go in the draw cell their top left corner is in,
+    #the ones that move are kept in a list and checked against the screen each frame. Blocks that don't draw anything (like Colliders) are left out.
+    #blocks in the draw cells are baked in to pictures (see bakeChunk), so they have to call redraw whenever they change how they look
+    def addDrawable(self, block):
+        if block.dynamic:
+            self.moving.append(block)
+        elif type(block).draw != Block.draw:
+            self.drawChunk(block.x, block.y)[1].append(block)
+            self.draw_margin = max(self.draw_margin, block.width, block.height, self.game.tilemanager.tile_width, self.game.tilemanager.tile_height)
+            self.redraw(block)
+
+    #takes a block out of the draw cells (see addDrawable)
+    def removeDrawable(self, block):
+        if block.dynamic:
+            if block in self.moving:
+                self.moving.remove(block)
+        else:
+            key = chunkKey(int(math.floor(block.x / Level.DRAW_CHUNK_WIDTH)), int(math.floor(block.y / Level.DRAW_CHUNK_HEIGHT)))
+            chunk = self.draw_chunks.get(key)
+            if chunk != None and block in chunk[1]:
+                chunk[1].remove(block)
+                self.redraw(block)
+
+    #throws away the baked pictures the block is drawn in, so they're baked again with it as it looks now (see bakeChunk)
+    def redraw(self, block):
+        self.redrawArea(block.x, block.y, block.width, block.height)
+
+    #throws away the baked pictures of every draw cell something in the area could be drawn in
+    def redrawArea(self, x, y, width, height):
+        if len(self.baked) == 0:
+            return
+        margin = self.draw_margin
+        cx0 = int(math.floor(x / Level.DRAW_CHUNK_WIDTH))
+        cy0 = int(math.floor(y / Level.DRAW_CHUNK_HEIGHT))
+        cx1 = int(math.floor((x + width + margin) / Level.DRAW_CHUNK_WIDTH))
+        cy1 = int(math.floor((y + height + margin) / Level.DRAW_CHUNK_HEIGHT))
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.baked.pop(chunkKey(cx, cy), None)
+
+    #gets the draw cells which could have something drawn in the area, things can be drawn up to draw_margin outside of their cell
+    def visibleChunks(self, x, y, width, height):
+        chunks = []
+        margin = self.draw_margin
+        cx0 = int(math.floor((x - margin) / Level.DRAW_CHUNK_WIDTH))
+        cy0 = int(math.floor((y - margin) / Level.DRAW_CHUNK_HEIGHT))
+        cx1 = int(math.floor((x + width) / Level.DRAW_CHUNK_WIDTH))
+        cy1 = int(math.floor((y + height) / Level.DRAW_CHUNK_HEIGHT))
+        get = self.draw_chunks.get
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                chunk = get(chunkKey(cx, cy))
+                if chunk != None:
+                    chunks.append(chunk)
+        return chunks
+
+    #moves the camera (offset) to keep the player in the middle of the screen without showing anything outside the level
+    def updateCamera(self):
+        if self.player != None:
+            width = self.game.screen.get_width()
+            height = self.game.screen.get_height()
+            self.offset.x = max(0, min(self.map_width - width, int(self.player.x + (self.player.width/2) - (width/2))))
+            self.offset.y = max(0, min(self.map_height - height, int(self.player.y + (self.player.height/2) - (height/2))))
+
+    #draws everything that doesn't move in the draw cell cx, cy (and whatever from the cells around it reaches in to it) on to one picture,
+    #the decorations and then the blocks by priority. returns None if there's nothing to draw there
+    def bakeChunk(self, cx, cy):
+        x = cx * Level.DRAW_CHUNK_WIDTH
+        y = cy * Level.DRAW_CHUNK_HEIGHT
+        chunks = self.visibleChunks(x, y, Level.DRAW_CHUNK_WIDTH - 1, Level.DRAW_CHUNK_HEIGHT - 1)
+        decorations = []
+        blocks = []
+        for chunk in chunks:
+            decorations.extend(chunk[0])
+            blocks.extend(chunk[1])
+        if len(decorations) == 0 and len(blocks) == 0:
+            return None
+        surface = pygame.Surface((Level.DRAW_CHUNK_WIDTH, Level.DRAW_CHUNK_HEIGHT), pygame.SRCALPHA)
+        queue = self.game.render_queue.begin(surface, Vector(x, y), self.draw_margin)
+        for decoration in decorations:
+            decoration.draw(queue, queue.offset)
+        for block in blocks:
+            queue.add(block)
+        queue.flush()
+        return surface
+
+    #draws what's on screen, the baked pictures of the draw cells the screen can see (see bakeChunk) and then the blocks that move by priority,
+    #so the cost depends on the size of the screen and not the level. Blocks that move are always drawn over the ones that don't.
+    #cells that go off screen are forgotten and baked again when they come back. returns the number of blits (see RenderQueue)
+    def draw(self, target):
+        offset = self.offset
+        x = offset.x
+        y = offset.y
+        width = target.get_width()
+        height = target.get_height()
+        cx0 = int(math.floor(x / Level.DRAW_CHUNK_WIDTH))
+        cy0 = int(math.floor(y / Level.DRAW_CHUNK_HEIGHT))
+        cx1 = int(math.floor((x + width - 1) / Level.DRAW_CHUNK_WIDTH))
+        cy1 = int(math.floor((y + height - 1) / Level.DRAW_CHUNK_HEIGHT))
+        baked = {}
+        pictures = []
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                key = chunkKey(cx, cy)
+                if key in self.baked:
+                    surface = self.baked[key]
+                else:
+                    surface = self.bakeChunk(cx, cy)
+                baked[key] = surface
+                if surface != None:
+                    pictures.append((surface, [(cx * Level.DRAW_CHUNK_WIDTH) - x, (cy * Level.DRAW_CHUNK_HEIGHT) - y]))
+        self.baked = baked
+        #sprites can be bigger than the block, so they're given the same margin as the draw cells
+        queue = self.game.render_queue.begin(target, offset, self.draw_margin)
+        for picture in pictures:
+            queue.blit(picture[0], picture[1])
+        for block in self.moving:
+            queue.add(block)
+        return queue.flush()
+
+    #draws the whole decoration layer, on screen or not (see draw)
+    def drawDecorations(self, target, offset):
+        for decoration in self.decorations:
+            decoration.draw(target, offset)
+
     #opens all the doors with the given doorid (see Door class)
     def openDoors(self, doorid):
         if str(doorid) in self.doors:
@@ -853,17 +1327,30 @@ class Level(World):
                 door.closeDoor()
 
     #restarts the level (re-initializes most of the variables and reloads the level from the level-dat)
+    #the first time the level is loaded a snapshot of its blocks is taken, restarting after that just puts them back (see restoreSnapshot)
     def restart(self):
-        self.reset()
         self.game.hooks = {}
         self.offset = Vector(0,0)
         self.state = 0
-        self.player = None
-        self.doors = {}
-        if self.load_type == Level.IMAGE_LOAD:
-            self.load_image(self.load_dat)
-        elif self.load_type == Level.JSON_LOAD:
-            self.load_JSON(self.load_dat)
+        self.previous = {}
+        if self.snapshot != None:
+            self.restoreSnapshot()
+        else:
+            self.reset()
+            self.player = None
+            self.doors = {}
+            self.decorations = []
+            if self.load_type == Level.IMAGE_LOAD:
+                self.load_image(self.load_dat)
+            elif self.load_type == Level.JSON_LOAD:
+                self.load_JSON(self.load_dat)
+            elif self.load_type == Level.MAP_LOAD:
+                self.load_map(self.load_dat)
+            elif self.load_type == Level.REGION_LOAD:
+                self.load_regions(self.load_dat)
+            #streamed levels are loaded again each time instead, their blocks come and go as the regions do
+            if self.regions == None:
+                self.takeSnapshot()
         #world, x, y, aniset, aniset_lock, tilemanager, direction, doorid = 0
         #for i in range(4):
         #    for j in range(10):
@@ -879,10 +1366,28 @@ class Level(World):
         self.state = 1
         self.respawn()
 
+    #saves the state of every block in the level that can change (see pycol.Block.canChange/saveState),
+    #the blocks added after this are kept track of in created
+    def takeSnapshot(self):
+        self.snapshot = [[block, block.saveState()] for block in self.block_set if block.canChange()]
+        self.created = set()
+
+    #puts the level back to how it was when the snapshot was taken, without loading it again.
+    #blocks added since then (the player, bullets and skulls that are no longer kept) are destroyed and the blocks
+    #that can change are put back, so it only costs as much as the number of those and not the size of the level.
+    def restoreSnapshot(self):
+        self.player = None
+        kept = set(self.skulls)
+        for block in list(self.created):
+            if not block in kept:
+                block.destroy()
+        for block, state in self.snapshot:
+            block.loadState(state)
+
     #sets the spawn point for the player when the level is restarted (see Checkpoint class)
     def setSpawn(self, spawn_tile):
         if spawn_tile != self.spawn_tile:
-            self.spawn = [self.player.x, self.player.y, self.player.vel, self.player.acc]
+            self.spawn = [self.player.x, self.player.y, self.player.vel.copy(), self.player.acc.copy()]
             self.spawn_tile = spawn_tile
 
     #respawns the player at the correct spawn (see setSpawn/killPlayer/Checkpoint class)
@@ -894,11 +1399,12 @@ class Level(World):
             self.player = Player(self, self.spawn[0], self.spawn[1], 22, 22, self.game.getAniSet("player"), self.game.entmanager)
             self.game.addHook(self.player, pygame.KEYDOWN)
             if len(self.spawn) > 2:
-                self.player.vel = self.spawn[2]
-                self.player.acc = self.spawn[3]
+                self.player.vel = self.spawn[2].copy()
+                self.player.acc = self.spawn[3].copy()
 
     #loads the level from an image, currently not up to date as JSON is vastly superior.
     def load_image(self, map_image):
+        self.tile_grid = TileGrid(map_image.get_width(), map_image.get_height(), self.game.tilemanager.tile_width, self.game.tilemanager.tile_height)
         for x in range(map_image.get_width()):
             for y in range(map_image.get_height()):
                 colour = map_image.get_at((x,y))
@@ -919,105 +1425,298 @@ class Level(World):
                     BackgroundTile(self, x, y, self.game.getAniSet("background"), self.game.tilemanager)
         self.map_width = map_image.get_width() * self.game.tilemanager.tile_width
         self.map_height = map_image.get_height() * self.game.tilemanager.tile_height
+        self.finishLoad()
 
-    #loads the level from a JSON dump (info is a dictionary containing information about the level)
+    #loads the level from a JSON dump (info is [width, height, grid] where width and height are in tiles,
+    #grid[x][y] is the list of layers in that tile and each layer is "x:y:z:name:id:key;value:...")
+    #only the tiles that are in the grid are visited, each one is passed to the loader for its name (see TILE_LOADERS)
     def load_JSON(self, info):
-        self.map_width = info[0] * self.game.tilemanager.tile_width
-        self.map_height = info[1] * self.game.tilemanager.tile_height
-        strgrid = info[2]
-        sawblocks = {}
-        for x in range(self.map_width):
-            if x < len(strgrid):
-                for y in range(self.map_height):
-                    if y < len(strgrid[x]):
-                        for z in range(10):
-                            if z < len(strgrid[x][y]):
-                                text = strgrid[x][y][z]
-                                if text != "None":
-                                    data = text.split(":")
-                                    iname = str(data[3])
-                                    iid = int(data[4])
-                                    
-                                    info = {}
-                                    for i in range(5, len(data)):
-                                        infodat = data[i].split(";")
-                                        info[infodat[0]] = infodat[1]
-
-                                    if iname == "blocks":
-                                        if iid == 0: #black
-                                            Wall(self, x, y, self.game.getAniSet("black_block"), self.game.tilemanager)
-                                        elif iid == 1 or iid == 2: #red
-                                            Wall(self, x, y, self.game.getAniSet("red_block"), self.game.tilemanager, 1)
-                                        else: #green
-                                            Wall(self, x, y, self.game.getAniSet("green_block"), self.game.tilemanager, 2)
-                                    elif iname == "spawn":
-                                        #self.player = Player(self, x*self.game.tilemanager.tile_width, y*self.game.tilemanager.tile_height, 22, 22, self.game.getAniSet("player"), self.game.entmanager)
-                                        if self.spawn == None:
-                                            self.spawn = [x*self.game.tilemanager.tile_width, y*self.game.tilemanager.tile_height]
-                                    elif iname == "spikes":
-                                        Spike(self, x*self.game.tilemanager.tile_width, (y*self.game.tilemanager.tile_height)+(self.game.tilemanager.tile_height  - 19), 32, 19, self.game.getAniSet("spike"), self.game.entmanager)
-                                    elif iname == "turrets":
-                                        offset = 0
-                                        if "offset" in info:
-                                            offset = int(info["offset"])
-                                        Turret(self, x, y, self.game.getAniSet("turret"), self.game.tilemanager, iid, offset)
-                                    elif iname == "saw_block":
-                                        saw_id = info["saw_id"]
-                                        if not saw_id in sawblocks.keys():
-                                            sawblocks[saw_id] = [None] * int(info["path_length"])
-                                        saw_pos = int(info["saw_pos"])
-                                        sawblocks[saw_id][saw_pos] = [(x*self.game.tilemanager.tile_width) + math.floor(self.game.tilemanager.tile_width/2), (y*self.game.tilemanager.tile_height) + math.floor(self.game.tilemanager.tile_height/2)]
-                                        #world, pos_list, speed, radius, aniset, entmanager
-                                        #if not None in sawblocks[saw_id]:
-                                        #    Saw(self, sawblocks[saw_id], int(info["speed"]), int(info["radius"]), self.game.getAniSet("saw"), self.game.entmanager)
-                                    elif iname == "door":
-                                        doorid = info["doorid"]
-                                        direction = 2
-                                        if iid == 0:
-                                            direction = 3
-                                        elif iid == 1:
-                                            direction = 1
-                                        elif iid == 2:
-                                            direction = 0
-                                        #world, x, y, aniset, aniset_lock, tilemanager, direction, doorid = 0
-                                        door = Door(self, x, y, self.game.getAniSet("door"), self.game.getAniSet("lock"), self.game.tilemanager, direction, doorid)
-                                        self.addDoor(door)
-                                    elif iname == "button":
-                                        #self, world, x, y, aniset, tilemanager, direction, doorid = 0, button_lock = False
-                                        direction_raw = math.floor(iid/20)
-                                        direction = 0
-                                        if direction_raw == 0:
-                                            direction = 0
-                                        elif direction_raw == 1:
-                                            direction = 2
-                                        elif direction == 2:
-                                            direction = 1
-                                        elif direction == 3:
-                                            direction = 3
-                                        doorid = math.floor( (iid - (direction_raw * 20)) / 2 )
-                                        button_lock = False
-                                        if "button lock" in info:
-                                            button_lock = bool(info["button lock"])
-                                        Button(self, x, y, self.game.getAniSet("button"), self.game.tilemanager, direction, doorid, button_lock)
-                                    elif iname == "flag":
-                                        if iid == 0:
-                                            Checkpoint(self, x * self.game.tilemanager.tile_width + 8, y * self.game.tilemanager.tile_height + 6, 16, 26, self.game.getAniSet("checkpoint"), self.game.entmanager)
-                                        elif iid == 1:
-                                            FinishLine(self, x * self.game.tilemanager.tile_width + 8, y * self.game.tilemanager.tile_height + 6, 16, 26, self.game.getAniSet("finishline"), self.game.entmanager)
-                                    else:
-                                        BackgroundTile(self, x, y, self.game.getAniSet("background"), self.game.tilemanager, iid)
+        self.startLoad(info[0], info[1])
+        loaders = Level.TILE_LOADERS
+        for x, column in enumerate(info[2]):
+            for y, layers in enumerate(column):
+                for text in layers[:10]:
+                    if text != "None":
+                        data = text.split(":")
+                        tileinfo = {}
+                        for i in range(5, len(data)):
+                            infodat = data[i].split(";")
+                            tileinfo[infodat[0]] = infodat[1]
+                        loaders.get(data[3], Level.loadBackground)(self, x, y, int(data[4]), tileinfo)
+        self.finishLoad()
+
+    #loads the level from a binary level (levelmap is a pymap.LevelMap), the tiles are loaded the same way as load_JSON
+    def load_map(self, levelmap):
+        self.startLoad(levelmap.width, levelmap.height)
+        loaders = Level.TILE_LOADERS
+        for x, y, z, name, iid, info in levelmap.tiles():
+            loaders.get(name, Level.loadBackground)(self, x, y, iid, info)
+        self.finishLoad()
+
+    #sets up the size of the level and its tile grid before the tiles are loaded, width and height are in tiles
+    #streamed levels don't have a tile grid as it would be the size of the whole level, their tiles go in the chunks instead
+    def startLoad(self, width, height, tile_grid = True):
+        self.map_width = width * self.game.tilemanager.tile_width
+        self.map_height = height * self.game.tilemanager.tile_height
+        #walls and turrets are collided with through the tile grid (see pycol.TileGrid)
+        self.tile_grid = None
+        if tile_grid:
+            self.tile_grid = TileGrid(width, height, self.game.tilemanager.tile_width, self.game.tilemanager.tile_height)
+        self.sawblocks = {}
+
+    #starts a streamed level from a region file (regionfile is a pymap.RegionFile), only the regions around the spawn are loaded now.
+    #the rest are loaded and unloaded as the player and screen move (see streamRegions), so the size of the level doesn't matter.
+    #regions are loaded as they are in the file each time, so anything changed in a region (like an open door) is forgotten once it's unloaded
+    def load_regions(self, regionfile):
+        self.startLoad(regionfile.width, regionfile.height, False)
+        self.regions = {}
+        if self.spawn == None and regionfile.spawn != None:
+            self.spawn = [regionfile.spawn[0]*self.game.tilemanager.tile_width, regionfile.spawn[1]*self.game.tilemanager.tile_height]
+        self.finishLoad()
+        self.streamRegions()
+
+    #the areas [x, y, width, height] that need their regions loaded, the screen, the player, the skulls and the spawn point
+    def streamAreas(self):
+        areas = [[self.offset.x, self.offset.y, self.game.width, self.game.height]]
+        if self.player != None:
+            areas.append([self.player.x, self.player.y, self.player.width, self.player.height])
+        for skull in self.skulls:
+            areas.append([skull.x, skull.y, skull.width, skull.height])
+        if self.spawn != None:
+            areas.append([self.spawn[0], self.spawn[1], 0, 0])
+        return areas
+
+    #gets the set of regions (rx, ry) within margin regions of any of the areas
+    def regionsNear(self, areas, margin):
+        regionfile = self.load_dat
+        region_width = regionfile.region_width * self.game.tilemanager.tile_width
+        region_height = regionfile.region_height * self.game.tilemanager.tile_height
+        regions = set()
+        for area in areas:
+            rx0 = max(0, int(math.floor((area[0] / region_width) - margin)))
+            ry0 = max(0, int(math.floor((area[1] / region_height) - margin)))
+            rx1 = min(regionfile.regions_x - 1, int(math.floor(((area[0] + area[2]) / region_width) + margin)))
+            ry1 = min(regionfile.regions_y - 1, int(math.floor(((area[1] + area[3]) / region_height) + margin)))
+            for rx in range(rx0, rx1 + 1):
+                for ry in range(ry0, ry1 + 1):
+                    regions.add((rx, ry))
+        return regions
+
+    #loads the regions near the areas in streamAreas and unloads the ones that have got far away.
+    #regions under an area are loaded straight away, the ones within half a region of an area are loaded ahead of time
+    #but only REGIONS_PER_TICK of them each time so the cost is spread out. They're only unloaded once they're a whole region away
+    #so they don't flicker in and out
+    def streamRegions(self):
+        areas = self.streamAreas()
+        keep = self.regionsNear(areas, 1)
+        for key in list(self.regions.keys()):
+            if not key in keep:
+                self.unloadRegion(key)
+        for key in self.regionsNear(areas, 0):
+            if not key in self.regions:
+                self.loadRegion(key)
+        budget = Level.REGIONS_PER_TICK
+        for key in self.regionsNear(areas, 0.5):
+            if budget > 0 and not key in self.regions:
+                self.loadRegion(key)
+                budget -= 1
+
+    #checks if the point x, y is in a loaded region, always true if the level isn't streamed
+    def isLoaded(self, x, y):
+        if self.regions == None:
+            return True
+        key = (int(math.floor(x / (self.load_dat.region_width * self.game.tilemanager.tile_width))), int(math.floor(y / (self.load_dat.region_height * self.game.tilemanager.tile_height))))
+        return key in self.regions
+
+    #loads the tiles of a region, key is (rx, ry)
+    def loadRegion(self, key):
+        self.regions[key] = [[], []]
+        region = self.load_dat.readRegion(key[0], key[1])
+        if region == None:
+            return
+        self.loading_region = self.regions[key]
+        #the walls are made as if the level was just starting so they catch up with the current state when they're next updated (see Wall.update)
+        state = self.state
+        self.state = 0
+        loaders = Level.TILE_LOADERS
+        for x, y, z, name, iid, info in region.tiles():
+            loaders.get(name, Level.loadBackground)(self, x, y, iid, info)
+        self.state = state
+        self.loading_region = None
+
+    #destroys everything that was loaded with a region, key is (rx, ry)
+    def unloadRegion(self, key):
+        blocks, decorations = self.regions.pop(key)
+        self.unloading = set()
+        for block in blocks:
+            if block in self.block_set:
+                if isinstance(block, Door):
+                    self.doors[block.doorid].remove(block)
+                block.destroy()
+        if len(self.unloading) > 0:
+            for priority in self.blocks:
+                self.blocks[priority] = [block for block in self.blocks[priority] if not block in self.unloading]
+        self.unloading = None
+        if len(decorations) > 0:
+            chunks = [self.drawChunk(decoration.real_x, decoration.real_y) for decoration in decorations]
+            decorations = set(decorations)
+            self.decorations = [decoration for decoration in self.decorations if not decoration in decorations]
+            for chunk in chunks:
+                chunk[0] = [decoration for decoration in chunk[0] if not decoration in decorations]
+            for decoration in decorations:
+                self.redrawArea(decoration.real_x, decoration.real_y, 0, 0)
+
+    #the loaders for each tile name in a JSON level, x and y are in tiles, iid is the tile's id and info is its extra key/values
+    def loadBlocks(self, x, y, iid, info):
+        if iid == 0: #black
+            Wall(self, x, y, self.game.getAniSet("black_block"), self.game.tilemanager)
+        elif iid == 1 or iid == 2: #red
+            Wall(self, x, y, self.game.getAniSet("red_block"), self.game.tilemanager, 1)
+        else: #green
+            Wall(self, x, y, self.game.getAniSet("green_block"), self.game.tilemanager, 2)
+
+    def loadSpawn(self, x, y, iid, info):
+        if self.spawn == None:
+            self.spawn = [x*self.game.tilemanager.tile_width, y*self.game.tilemanager.tile_height]
+
+    def loadSpikes(self, x, y, iid, info):
+        Spike(self, x*self.game.tilemanager.tile_width, (y*self.game.tilemanager.tile_height)+(self.game.tilemanager.tile_height  - 19), 32, 19, self.game.getAniSet("spike"), self.game.entmanager)
+
+    def loadTurret(self, x, y, iid, info):
+        offset = 0
+        if "offset" in info:
+            offset = int(info["offset"])
+        Turret(self, x, y, self.game.getAniSet("turret"), self.game.tilemanager, iid, offset)
+
+    #saw paths are only collected for now, the saws themselves aren't made
+    def loadSawBlock(self, x, y, iid, info):
+        saw_id = info["saw_id"]
+        if not saw_id in self.sawblocks:
+            self.sawblocks[saw_id] = [None] * int(info["path_length"])
+        saw_pos = int(info["saw_pos"])
+        self.sawblocks[saw_id][saw_pos] = [(x*self.game.tilemanager.tile_width) + math.floor(self.game.tilemanager.tile_width/2), (y*self.game.tilemanager.tile_height) + math.floor(self.game.tilemanager.tile_height/2)]
+        #world, pos_list, speed, radius, aniset, entmanager
+        #if not None in self.sawblocks[saw_id]:
+        #    Saw(self, self.sawblocks[saw_id], int(info["speed"]), int(info["radius"]), self.game.getAniSet("saw"), self.game.entmanager)
+
+    def loadDoor(self, x, y, iid, info):
+        #doors are kept by the text of their doorid (see openDoors), binary levels store it as an int
+        doorid = str(info["doorid"])
+        direction = 2
+        if iid == 0:
+            direction = 3
+        elif iid == 1:
+            direction = 1
+        elif iid == 2:
+            direction = 0
+        #world, x, y, aniset, aniset_lock, tilemanager, direction, doorid = 0
+        door = Door(self, x, y, self.game.getAniSet("door"), self.game.getAniSet("lock"), self.game.tilemanager, direction, doorid)
+        self.addDoor(door)
+
+    def loadButton(self, x, y, iid, info):
+        #self, world, x, y, aniset, tilemanager, direction, doorid = 0, button_lock = False
+        direction_raw = math.floor(iid/20)
+        direction = 0
+        if direction_raw == 0:
+            direction = 0
+        elif direction_raw == 1:
+            direction = 2
+        elif direction == 2:
+            direction = 1
+        elif direction == 3:
+            direction = 3
+        doorid = math.floor( (iid - (direction_raw * 20)) / 2 )
+        button_lock = False
+        if "button lock" in info:
+            button_lock = bool(info["button lock"])
+        Button(self, x, y, self.game.getAniSet("button"), self.game.tilemanager, direction, doorid, button_lock)
+
+    def loadFlag(self, x, y, iid, info):
+        if iid == 0:
+            Checkpoint(self, x * self.game.tilemanager.tile_width + 8, y * self.game.tilemanager.tile_height + 6, 16, 26, self.game.getAniSet("checkpoint"), self.game.entmanager)
+        elif iid == 1:
+            FinishLine(self, x * self.game.tilemanager.tile_width + 8, y * self.game.tilemanager.tile_height + 6, 16, 26, self.game.getAniSet("finishline"), self.game.entmanager)
+
+    #any tile without a loader is part of the background
+    def loadBackground(self, x, y, iid, info):
+        BackgroundTile(self, x, y, self.game.getAniSet("background"), self.game.tilemanager, iid)
+
+    TILE_LOADERS = {
+        "blocks": loadBlocks,
+        "spawn": loadSpawn,
+        "spikes": loadSpikes,
+        "turrets": loadTurret,
+        "saw_block": loadSawBlock,
+        "door": loadDoor,
+        "button": loadButton,
+        "flag": loadFlag
+    }
+
+    #called once the blocks have been loaded, gets the collision structures ready
+    #the chunk size is only tuned the first time the level is loaded, it's kept through restarts
+    def finishLoad(self):
+        if self.tile_grid != None and self.game.bake_colliders:
+            self.bakeColliders()
+        if self.game.tune_chunks and self.chunk_tuning == None:
+            self.chunk_tuning = self.tuneChunkSize(self.game.query_trace)
+        #streamed levels keep their blocks in the chunks, they'd have to rebuild the BVH every time a region changed
+        if self.game.static_bvh and self.regions == None:
+            self.buildStatic()
+
+    #merges the solid, non-toggling walls in the tile grid in to as few rectangular Colliders as possible (see pycol.mergeRects).
+    #the walls are taken out of the tile grid but stay in the level to be drawn, so a long floor is one block to collide with
+    def bakeColliders(self):
+        grid = self.tile_grid
+        cells = bytearray(grid.width * grid.height)
+        for i in range(len(grid.blocks)):
+            block = grid.blocks[i]
+            if isinstance(block, Wall) and block.tileid == 0 and block.solid:
+                cells[i] = 1
+        for rect in mergeRects(grid.width, grid.height, cells):
+            for ty in range(rect[1], rect[1] + rect[3]):
+                for tx in range(rect[0], rect[0] + rect[2]):
+                    grid.blocks[tx + (ty * grid.width)].in_grid = False
+                    grid.remove(tx, ty)
+            Collider(self, rect[0] * grid.tile_width, rect[1] * grid.tile_height, rect[2] * grid.tile_width, rect[3] * grid.tile_height)
 
     #updates all the blocks if the game is not paused, draws the blocks regardless.
     def tick(self, elapsed, paused):
+        self.step(elapsed, paused)
+        self.render(self.game.screen)
+
+    #updates every block in the level by elapsed seconds, remembering where the blocks that move were before (see render)
+    def step(self, elapsed, paused):
         #blockset = self.player.get_blocks()
         #blockset.append(self.player)
+        if paused:
+            return
+        if self.regions != None:
+            self.streamRegions()
+        self.previous = {}
+        for block in self.moving:
+            self.previous[block] = (block.x, block.y)
         for i in range(self.max_priority+1):
             if i in self.blocks.keys():
                 block_list = self.blocks[i]
                 for block in block_list:
-                    if not paused:
-                        if block.update(elapsed) == True:
-                            break
-                    block.draw(self.game.screen, self.offset)
-        if not paused:
-            self.level_timer += elapsed
+                    if block.update(elapsed) == True:
+                        break
+        self.level_timer += elapsed
+
+    #moves the camera and draws the level on to target. The blocks that move are drawn alpha of the way
+    #from where they were before the last step to where they are now, then put back (see step)
+    def render(self, target, alpha = 1):
+        moved = []
+        if alpha < 1:
+            for block in self.moving:
+                if block in self.previous:
+                    x, y = self.previous[block]
+                    moved.append((block, block.x, block.y))
+                    block.x = x + ((block.x - x) * alpha)
+                    block.y = y + ((block.y - y) * alpha)
+        self.updateCamera()
+        drawn = self.draw(target)
+        for block, x, y in moved:
+            block.x = x
+            block.y = y
+        return drawn
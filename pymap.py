@@ -0,0 +1,429 @@
+import struct, array, sys, json, operator
+from itertools import chain, repeat
+
+#binary level format, an alternative to the .tmd JSON dumps made by the editor (see editor_main.Map.pack_info)
+#
+#   header:         "PMAP", version (u8), width (u32), height (u32), layer count (u8)
+#   string table:   count (u32), then each string as its length (u16) followed by its utf-8 bytes.
+#                   tile names, property keys and text property values are all stored here once
+#   each layer:     run count (u32), then the runs as 4 arrays: first cell (u32), length (u32), name (u16), id (i32)
+#                   then the property count (u32) and the properties as 4 arrays: run (u32), key (u16), type (u8), value (i32)
+#
+#cells are numbered x * height + y (the same order as the JSON grid), empty cells aren't stored at all.
+#a run is a line of cells on the same layer with the same name and id, tiles with properties always get a run of their own.
+#property values are either ints or strings (the value is then an index in to the string table).
+#either way they're loaded as text, the same as the properties of a .tmd level
+#
+#region files (.pmr) split the level in to fixed size regions of tiles so they can be loaded a few at a time (see Level.load_regions):
+#
+#   header:         "PMRG", version (u8), width (u32), height (u32), layer count (u8), region width (u16), region height (u16),
+#                   spawn x (i32), spawn y (i32) (the first spawn tile, -1 if there isn't one)
+#   string table:   the same as above, shared by every region
+#   index:          the offset (u32) and size (u32) of every region, a row of regions at a time. empty regions have a size of 0
+#   regions:        each is its layers in the same format as above, with the cells numbered from the region's corner
+#
+#can also be run to convert between the formats: python pymap.py <input> <output>
+
+MAGIC = b"PMAP"
+VERSION = 1
+HEADER = struct.Struct("<4sBIIB")
+REGION_MAGIC = b"PMRG"
+REGION_HEADER = struct.Struct("<4sBIIBHHii")
+COUNT = struct.Struct("<I")
+LENGTH = struct.Struct("<H")
+
+#property value types
+STRING_VALUE = 0
+INT_VALUE = 1
+
+#the info of every tile without properties (see LevelMap.tiles)
+EMPTY_INFO = {}
+
+INT_MIN = -(1 << 31)
+INT_MAX = (1 << 31) - 1
+
+#array typecode with 4 byte unsigned items, "I" is 4 bytes on nearly every platform
+UINT32 = "I"
+if array.array("I").itemsize != 4:
+    UINT32 = "L"
+
+#the array types of a layer's runs and properties (see the format above)
+RUN_ARRAYS = [UINT32, UINT32, "H", "i"]
+PROP_ARRAYS = [UINT32, "H", "B", "i"]
+
+#checks if data (bytes) is a binary level
+def isMap(data):
+    return data[:len(MAGIC)] == MAGIC
+
+#checks if data (bytes, only the start is needed) is a region file
+def isRegions(data):
+    return data[:len(REGION_MAGIC)] == REGION_MAGIC
+
+#gets a property value as an int if it was written as one, so it's stored typed, otherwise the text is kept.
+#ints are only stored like this if they read back as the same text, as they're given back as text when loaded (see readLayers)
+def typedValue(text):
+    try:
+        value = int(text)
+    except ValueError:
+        return text
+    if str(value) != text or value < INT_MIN or value > INT_MAX:
+        return text
+    return value
+
+#a level read from the binary format.
+#layers is a list of [starts, lengths, names, ids, props] for each layer, the first four are arrays (see the format above)
+#and props is a dictionary from run index to the dictionary of properties for that run
+#x and y are the tile the map starts at, only regions (see RegionFile) don't start at 0, 0
+class LevelMap:
+    def __init__(self, width, height, strings, layers, x = 0, y = 0):
+        self.width = width
+        self.height = height
+        self.strings = strings
+        self.layers = layers
+        self.x = x
+        self.y = y
+
+    #gets every tile in the level as (x, y, z, name, id, info), in the same order they're in a JSON level
+    #(by x, then y, then layer). Tiles without properties all share the one empty info dictionary, so copy it before changing it.
+    #the runs are expanded with itertools so there's no python code run per tile
+    def tiles(self):
+        tiles = []
+        height = self.height
+        strings = self.strings
+        used_layers = 0
+        for z in range(len(self.layers)):
+            starts, lengths, names, ids, props = self.layers[z]
+            if len(starts) == 0:
+                continue
+            used_layers += 1
+            infos = [EMPTY_INFO] * len(starts)
+            for run in props:
+                infos[run] = props[run]
+            indexes = list(chain.from_iterable(map(range, starts, map(operator.add, starts, lengths))))
+            xs = map(operator.floordiv, indexes, repeat(height))
+            ys = map(operator.mod, indexes, repeat(height))
+            if self.x != 0 or self.y != 0:
+                xs = map(operator.add, xs, repeat(self.x))
+                ys = map(operator.add, ys, repeat(self.y))
+            tiles.extend(zip(xs, ys, repeat(z),
+                             chain.from_iterable(map(repeat, [strings[name] for name in names], lengths)),
+                             chain.from_iterable(map(repeat, ids, lengths)),
+                             chain.from_iterable(map(repeat, infos, lengths))))
+        if used_layers > 1:
+            layer_count = len(self.layers)
+            tiles.sort(key = lambda tile: ((tile[0] - self.x) * height + tile[1] - self.y) * layer_count + tile[2])
+        return tiles
+
+    #converts the level back in to the JSON format ([width, height, grid], see editor_main.Map.pack_info)
+    def toJSON(self):
+        return toJSON(self)
+
+#converts a LevelMap or RegionFile in to the JSON format ([width, height, grid], see editor_main.Map.pack_info)
+def toJSON(level):
+    if isinstance(level, RegionFile):
+        layer_count = level.layer_count
+    else:
+        layer_count = len(level.layers)
+    grid = []
+    for x in range(level.width):
+        grid.append([])
+        for y in range(level.height):
+            grid[x].append(["None"] * layer_count)
+    for tile in level.tiles():
+        text = str(tile[0])+":"+str(tile[1])+":"+str(tile[2])+":"+tile[3]+":"+str(tile[4])
+        for key in tile[5]:
+            text = text + ":" + key + ";" + str(tile[5][key])
+        grid[tile[0]][tile[1]][tile[2]] = text
+    return [level.width, level.height, grid]
+
+#keeps the string table while a level is being packed
+class StringTable:
+    def __init__(self):
+        self.strings = []
+        self.ids = {}
+
+    #gets the index of a string in the table, adding it if it's new
+    def get(self, text):
+        if not text in self.ids:
+            self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return self.ids[text]
+
+    #the table in the file format, the count followed by each string
+    def pack(self):
+        out = [COUNT.pack(len(self.strings))]
+        for text in self.strings:
+            encoded = text.encode("utf-8")
+            out.append(LENGTH.pack(len(encoded)))
+            out.append(encoded)
+        return b"".join(out)
+
+#gets the number of layers in a JSON level's grid
+def layerCount(grid):
+    layer_count = 0
+    for column in grid:
+        for layers in column:
+            layer_count = max(layer_count, len(layers))
+    return layer_count
+
+#packs the layers of the area of a JSON grid starting at x0, y0 (width by height tiles), strings is the StringTable.
+#returns the bytes, cells are numbered from the corner of the area
+def packLayers(grid, x0, y0, width, height, layer_count, strings):
+    out = []
+    for z in range(layer_count):
+        runs = [array.array(code) for code in RUN_ARRAYS]
+        props = [array.array(code) for code in PROP_ARRAYS]
+        last = None
+        for x in range(x0, min(x0 + width, len(grid))):
+            column = grid[x]
+            for y in range(y0, min(y0 + height, len(column))):
+                if z >= len(column[y]) or column[y][z] == "None":
+                    last = None
+                    continue
+                data = column[y][z].split(":")
+                index = (x - x0) * height + y - y0
+                name = strings.get(data[3])
+                iid = int(data[4])
+                if len(data) == 5 and last == [name, iid] and runs[0][-1] + runs[1][-1] == index:
+                    runs[1][-1] += 1
+                    continue
+                run = len(runs[0])
+                runs[0].append(index)
+                runs[1].append(1)
+                runs[2].append(name)
+                runs[3].append(iid)
+                last = [name, iid]
+                if len(data) > 5:
+                    last = None
+                    for i in range(5, len(data)):
+                        infodat = data[i].split(";")
+                        value = typedValue(infodat[1])
+                        props[0].append(run)
+                        props[1].append(strings.get(infodat[0]))
+                        if isinstance(value, int):
+                            props[2].append(INT_VALUE)
+                            props[3].append(value)
+                        else:
+                            props[2].append(STRING_VALUE)
+                            props[3].append(strings.get(value))
+        for arrays in [runs, props]:
+            out.append(COUNT.pack(len(arrays[0])))
+            for values in arrays:
+                if sys.byteorder == "big":
+                    values.byteswap()
+                out.append(values.tobytes())
+    return b"".join(out)
+
+#packs a level in the JSON format ([width, height, grid]) in to the binary format, returns the bytes
+def pack(info):
+    strings = StringTable()
+    layer_count = layerCount(info[2])
+    layers = packLayers(info[2], 0, 0, info[0], info[1], layer_count, strings)
+    return HEADER.pack(MAGIC, VERSION, info[0], info[1], layer_count) + strings.pack() + layers
+
+#finds the first spawn tile in a JSON level (by x, then y, then layer), returns [x, y] or None
+def findSpawn(grid):
+    for x in range(len(grid)):
+        for y in range(len(grid[x])):
+            for text in grid[x][y]:
+                if text != "None" and text.split(":")[3] == "spawn":
+                    return [x, y]
+    return None
+
+#packs a level in the JSON format in to a region file (see the format above), returns the bytes
+def packRegions(info, region_width = 16, region_height = 16):
+    width = info[0]
+    height = info[1]
+    grid = info[2]
+    strings = StringTable()
+    layer_count = layerCount(grid)
+    regions_x = (width + region_width - 1) // region_width
+    regions_y = (height + region_height - 1) // region_height
+    blobs = []
+    for ry in range(regions_y):
+        for rx in range(regions_x):
+            x0 = rx * region_width
+            y0 = ry * region_height
+            blobs.append(packLayers(grid, x0, y0, min(region_width, width - x0), min(region_height, height - y0), layer_count, strings))
+    spawn = findSpawn(grid)
+    if spawn == None:
+        spawn = [-1, -1]
+    header = REGION_HEADER.pack(REGION_MAGIC, VERSION, width, height, layer_count, region_width, region_height, spawn[0], spawn[1])
+    header = header + strings.pack()
+    index = array.array(UINT32)
+    pos = len(header) + (len(blobs) * 2 * index.itemsize)
+    #regions without any tiles (every count in them is 0) are left out
+    empty = [blob.count(b"\0") == len(blob) for blob in blobs]
+    for i in range(len(blobs)):
+        if empty[i]:
+            index.extend([pos, 0])
+        else:
+            index.extend([pos, len(blobs[i])])
+            pos += len(blobs[i])
+    if sys.byteorder == "big":
+        index.byteswap()
+    return header + index.tobytes() + b"".join([blobs[i] for i in range(len(blobs)) if not empty[i]])
+
+#reads count items of each of the typecodes from data starting at pos, returns [arrays, new pos]
+def readArrays(data, pos, typecodes, count):
+    arrays = []
+    for code in typecodes:
+        values = array.array(code)
+        end = pos + (values.itemsize * count)
+        values.frombytes(data[pos:end])
+        if sys.byteorder == "big":
+            values.byteswap()
+        arrays.append(values)
+        pos = end
+    return [arrays, pos]
+
+#reads the string table from data starting at pos, returns [strings, new pos]
+def readStrings(data, pos):
+    count = COUNT.unpack_from(data, pos)[0]
+    pos += COUNT.size
+    strings = []
+    for i in range(count):
+        length = LENGTH.unpack_from(data, pos)[0]
+        pos += LENGTH.size
+        strings.append(bytes(data[pos:pos + length]).decode("utf-8"))
+        pos += length
+    return [strings, pos]
+
+#reads layer_count layers from data starting at pos, returns [layers, new pos] (see LevelMap for layers)
+def readLayers(data, pos, layer_count, strings):
+    layers = []
+    for z in range(layer_count):
+        count = COUNT.unpack_from(data, pos)[0]
+        runs, pos = readArrays(data, pos + COUNT.size, RUN_ARRAYS, count)
+        count = COUNT.unpack_from(data, pos)[0]
+        prop_arrays, pos = readArrays(data, pos + COUNT.size, PROP_ARRAYS, count)
+        props = {}
+        for i in range(count):
+            run = prop_arrays[0][i]
+            value = prop_arrays[3][i]
+            if prop_arrays[2][i] == STRING_VALUE:
+                value = strings[value]
+            else:
+                value = str(value)
+            if not run in props:
+                props[run] = {}
+            props[run][strings[prop_arrays[1][i]]] = value
+        layers.append(runs + [props])
+    return [layers, pos]
+
+#unpacks a level from the bytes made by pack, returns a LevelMap
+def unpack(data):
+    data = memoryview(data)
+    magic, version, width, height, layer_count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not a binary level")
+    if version != VERSION:
+        raise ValueError("unsupported binary level version " + str(version))
+    strings, pos = readStrings(data, HEADER.size)
+    layers, pos = readLayers(data, pos, layer_count, strings)
+    return LevelMap(width, height, strings, layers)
+
+#a region file (see the format above), only the header, string table and index are read when it's opened.
+#regions are read from the file when they're asked for, so the size of the level doesn't matter
+class RegionFile:
+    def __init__(self, filename):
+        self.filename = filename
+        f = open(filename, "rb")
+        data = f.read(REGION_HEADER.size)
+        magic, version, self.width, self.height, self.layer_count, self.region_width, self.region_height, spawn_x, spawn_y = REGION_HEADER.unpack(data)
+        if magic != REGION_MAGIC:
+            f.close()
+            raise ValueError("not a region file")
+        if version != VERSION:
+            f.close()
+            raise ValueError("unsupported region file version " + str(version))
+        self.spawn = None
+        if spawn_x >= 0:
+            self.spawn = [spawn_x, spawn_y]
+        self.regions_x = (self.width + self.region_width - 1) // self.region_width
+        self.regions_y = (self.height + self.region_height - 1) // self.region_height
+        #the string table is read in two steps as its size isn't known
+        data = f.read(COUNT.size)
+        count = COUNT.unpack(data)[0]
+        for i in range(count):
+            length = f.read(LENGTH.size)
+            data = data + length + f.read(LENGTH.unpack(length)[0])
+        self.strings = readStrings(data, 0)[0]
+        #the offset and size of each region, one after the other
+        count = self.regions_x * self.regions_y * 2
+        self.index = readArrays(f.read(count * COUNT.size), 0, [UINT32], count)[0][0]
+        f.close()
+
+    #reads the region at rx, ry (in regions, not tiles), returns a LevelMap of it or None if it's empty or outside the level
+    def readRegion(self, rx, ry):
+        if rx < 0 or ry < 0 or rx >= self.regions_x or ry >= self.regions_y:
+            return None
+        i = (ry * self.regions_x + rx) * 2
+        size = self.index[i + 1]
+        if size == 0:
+            return None
+        f = open(self.filename, "rb")
+        f.seek(self.index[i])
+        data = f.read(size)
+        f.close()
+        x = rx * self.region_width
+        y = ry * self.region_height
+        layers = readLayers(data, 0, self.layer_count, self.strings)[0]
+        return LevelMap(min(self.region_width, self.width - x), min(self.region_height, self.height - y), self.strings, layers, x, y)
+
+    #gets every tile in the level (see LevelMap.tiles), a region at a time so they aren't in the same order as a whole level
+    def tiles(self):
+        tiles = []
+        for ry in range(self.regions_y):
+            for rx in range(self.regions_x):
+                region = self.readRegion(rx, ry)
+                if region != None:
+                    tiles.extend(region.tiles())
+        return tiles
+
+#saves a level in the JSON format (see pack) to filename in the binary format
+def save(filename, info):
+    f = open(filename, "wb")
+    f.write(pack(info))
+    f.close()
+
+#loads a binary level from filename, returns a LevelMap
+def load(filename):
+    f = open(filename, "rb")
+    data = f.read()
+    f.close()
+    return unpack(data)
+
+#saves a level in the JSON format to filename as a region file (see packRegions)
+def saveRegions(filename, info, region_width = 16, region_height = 16):
+    f = open(filename, "wb")
+    f.write(packRegions(info, region_width, region_height))
+    f.close()
+
+#converts a level file between the formats, the input's format is worked out from the file itself
+#and the output's from its extension (.pmd is binary, .pmr is a region file and anything else is JSON)
+def convert(in_name, out_name):
+    f = open(in_name, "rb")
+    data = f.read()
+    f.close()
+    if isMap(data):
+        info = unpack(data).toJSON()
+    elif isRegions(data):
+        info = toJSON(RegionFile(in_name))
+    else:
+        info = json.loads(data.decode("utf-8"))
+    if out_name.endswith(".pmd"):
+        save(out_name, info)
+    elif out_name.endswith(".pmr"):
+        saveRegions(out_name, info)
+    else:
+        f = open(out_name, "w")
+        json.dump(info, f)
+        f.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python pymap.py <input> <output>")
+        print("converts a level between the .tmd JSON format, the .pmd binary format and the .pmr region format")
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2])
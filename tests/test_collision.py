@@ -0,0 +1,121 @@
+#regression checks for the collision engine, run them from the repository root with "python -m unittest discover tests"
+import os, random, unittest
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from pycol import World, Block, SweepAndPrune, sweepBox
+
+class Wall(Block):
+    def get_type(self):
+        return "wall"
+
+class Mover(Block):
+    dynamic = True
+
+    def get_type(self):
+        return "mover"
+
+#a level with a turret at 4, 5 facing right in to walls at 5, 5 and 6, 5, surrounded by walls
+def turretLevel():
+    width, height = 12, 10
+    grid = []
+    for x in range(width):
+        column = []
+        for y in range(height):
+            name = "None:0"
+            if x == 0 or y == 0 or x == width - 1 or y == height - 1 or (x, y) in ((5, 5), (6, 5)):
+                name = "blocks:0"
+            elif (x, y) == (1, 8):
+                name = "spawn:0"
+            elif (x, y) == (4, 5):
+                name = "turrets:1"
+            column.append([str(x) + ":" + str(y) + ":0:" + name])
+        grid.append(column)
+    return [width, height, grid]
+
+class SweepTest(unittest.TestCase):
+    def test_overlap_is_hit_at_start(self):
+        self.assertEqual(sweepBox(5, 0, 10, 10, 4, 0, 10, 0, 10, 10), [0, 0])
+        self.assertEqual(sweepBox(5, 0, 10, 10, 0, -4, 10, 0, 10, 10), [0, 1])
+        self.assertEqual(sweepBox(5, 0, 10, 10, 4, 0, 10, 0, 10, 10, False), [0, 0])
+
+    def test_touching_moving_away_is_not_hit(self):
+        self.assertEqual(sweepBox(0, 0, 10, 10, -4, 0, 10, 0, 10, 10), None)
+        self.assertEqual(sweepBox(0, 0, 10, 10, -4, 0, 10, 0, 10, 10, False), None)
+
+    def test_block_inside_wall_cant_move_through(self):
+        world = World(64, 64)
+        wall = Wall(world, 32, 0, 32, 32, world.nextID())
+        wall.updateChunks()
+        mover = Mover(world, 40, 10, 5, 5, world.nextID())
+        mover.updateChunks()
+        self.assertEqual(mover.move(100, 0, False, False), [False, True])
+        self.assertTrue(mover.x + mover.width <= wall.x + wall.width)
+
+class SweepAndPruneTest(unittest.TestCase):
+    #blocks added, moved and removed in a random order are always found by candidates, and the lists stay sorted
+    def test_candidates_after_changes(self):
+        world = World(64, 64)
+        sap = SweepAndPrune()
+        rand = random.Random(0)
+        blocks = []
+        for i in range(2000):
+            roll = rand.random()
+            if roll < 0.4 or len(blocks) == 0:
+                #bullets from the same turret start at the same x
+                block = Mover(world, rand.choice([100, 200, rand.uniform(0, 1000)]), 0, 10, 10, world.nextID())
+                sap.add(block)
+                blocks.append(block)
+            elif roll < 0.7:
+                block = blocks.pop(rand.randrange(len(blocks)))
+                sap.remove(block)
+            else:
+                block = rand.choice(blocks)
+                block.x += rand.uniform(-50, 50)
+                sap.update(block)
+            self.assertEqual(sap.keys, sorted(sap.keys))
+            x = rand.uniform(0, 1000)
+            found = set(sap.candidates(x, 30))
+            for block in blocks:
+                if block.x + block.width >= x and block.x <= x + 30:
+                    self.assertTrue(block in found)
+        self.assertEqual(len(sap.bodies), len(blocks))
+
+class HierarchicalTest(unittest.TestCase):
+    #levels made for a big block are dropped once it's gone, so queries don't keep looking through them
+    def test_empty_levels_dropped(self):
+        world = World(32, 32, False, True)
+        small = Mover(world, 0, 0, 10, 10, world.nextID())
+        small.updateChunks()
+        big = Mover(world, 0, 0, 500, 500, world.nextID())
+        big.updateChunks()
+        self.assertTrue(len(world.levels) > 1)
+        self.assertEqual(world.checkAndReturnArea(600, 600, 10, 10), [])
+        big.destroy()
+        self.assertEqual(len(world.levels), 1)
+        self.assertEqual(world.chunksInArea(0, 0, 10, 10), small.chunks)
+
+class BulletTest(unittest.TestCase):
+    #bullets fired in to a wall right next to the turret are destroyed before they get anywhere
+    def test_bullet_spawned_in_wall(self):
+        import game_main
+        from pyani import SteppedClock
+        from pylevel import Level, Bullet
+        game = game_main.game
+        clock = game.clock
+        game.clock = SteppedClock()
+        try:
+            level = game.loadLevel(None, None, turretLevel(), Level.JSON_LOAD)
+            tile_width = game.tilemanager.tile_width
+            fired = 0
+            for i in range(1000):
+                game.update(game.step_time)
+                for block in list(level.block_set):
+                    if isinstance(block, Bullet):
+                        fired += 1
+                        self.assertTrue(block.x < 6 * tile_width, "bullet went through the wall to " + str(block.x))
+            self.assertTrue(fired > 0)
+        finally:
+            game.clock = clock
+
+if __name__ == "__main__":
+    unittest.main()
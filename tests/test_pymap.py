@@ -0,0 +1,22 @@
+#checks that the binary level formats load the same as the .tmd JSON, run from the repository root with "python -m unittest discover tests"
+import unittest
+import pymap
+
+#a 3x2 level with a button and door whose properties look like ints
+LEVEL = [3, 2, [[["0:0:0:button:0:button lock;0:doorid;3"], ["0:1:0:blocks:0"]],
+                [["1:0:0:door:1:doorid;3"], ["1:1:0:None:0"]],
+                [["2:0:0:spawn:0"], ["2:1:0:saw_block:0:saw_id;a:speed;-5"]]]]
+
+class PropertyTest(unittest.TestCase):
+    #properties come back as the text they were written as, like they do from .tmd, even when they're stored as ints
+    def test_properties_are_text(self):
+        infos = {}
+        for x, y, z, name, iid, info in pymap.unpack(pymap.pack(LEVEL)).tiles():
+            if len(info) > 0:
+                infos[name] = info
+        self.assertEqual(infos["button"], {"button lock": "0", "doorid": "3"})
+        self.assertEqual(infos["door"], {"doorid": "3"})
+        self.assertEqual(infos["saw_block"], {"saw_id": "a", "speed": "-5"})
+
+if __name__ == "__main__":
+    unittest.main()